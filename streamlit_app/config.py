@@ -384,6 +384,15 @@ FIXTURE_VIEW = "Fixture"
 # Cache TTL (in seconds)
 CACHE_TTL = 3600  # 1 hour
 
+# Worker threads for concurrent CDF fetches
+FETCH_MAX_WORKERS = 8
+
+# Nodes per page when streaming a view from CDF
+NODE_PAGE_SIZE = 500
+
+# On-disk copies of fetched data (survive restarts, served when CDF is unreachable)
+CACHE_DIR = "~/.cache/fpl"
+
 # Plotly Chart Theme Configuration
 PLOTLY_THEME = {
     "layout": {
@@ -10,7 +10,7 @@ from .utils import (
     fetch_team_betting_data, fetch_teams, fetch_transfer_data,
     fetch_players, fetch_player_picks_from_raw, fetch_player_gameweek_points,
     fetch_current_gameweek, fetch_manager_teams, fetch_fixtures,
-    get_team_color, create_team_badge
+    get_team_color, create_team_badge, prefetch_all
 )
 from .tabs import (
     leaderboard, performance_trends, transfer_analysis,
@@ -49,6 +49,7 @@ def main():
     
     # Fetch data
     with st.spinner("Loading data from CDF..."):
+        prefetch_all(client)
         managers_df = fetch_managers(client)
         teams_dict = fetch_teams(client)
     
@@ -113,7 +114,7 @@ def main():
     # Render tabs
     with tab1:
         leaderboard.render(
-            client, managers_df, 
+            client, managers_df, teams_dict,
             fetch_current_gameweek, fetch_manager_teams,
             fetch_performance_data, fetch_players, fetch_player_gameweek_points
         )
@@ -137,7 +138,8 @@ def main():
     
     with tab5:
         formation_analysis.render(
-            client, managers_df, fetch_manager_teams, fetch_players, fetch_player_picks_from_raw
+            client, managers_df, fetch_manager_teams, fetch_players, fetch_player_picks_from_raw,
+            teams_dict
         )
     
     with tab6:
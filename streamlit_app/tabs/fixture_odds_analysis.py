@@ -5,7 +5,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from ..utils import apply_plotly_theme
+from ..utils import apply_plotly_theme, get_lookups
 
 
 def render(client, managers_df, fetch_teams, fetch_players, fetch_team_betting_data, fetch_fixtures):
@@ -16,7 +16,7 @@ def render(client, managers_df, fetch_teams, fetch_players, fetch_team_betting_d
     # Fetch data
     with st.spinner("Loading fixture analysis data..."):
         teams_dict = fetch_teams(client)
-        players_dict = fetch_players(client)
+        players_df = fetch_players(client)
         betting_df = fetch_team_betting_data(client)
         fixtures_df = fetch_fixtures(client)
     
@@ -28,6 +28,7 @@ def render(client, managers_df, fetch_teams, fetch_players, fetch_team_betting_d
     # Map team IDs to names
     fixtures_df['home_team_name'] = fixtures_df['home_team_id'].map(teams_dict)
     fixtures_df['away_team_name'] = fixtures_df['away_team_id'].map(teams_dict)
+    players_dict = get_lookups(teams_dict, players_df).players_by_id
     
     # Overview metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -5,7 +5,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from ..utils import apply_plotly_theme
+from ..utils import apply_plotly_theme, get_lookups
 
 
 def calculate_formation(player_positions, multipliers):
@@ -34,7 +34,7 @@ def calculate_formation(player_positions, multipliers):
     return f"{defenders}-{midfielders}-{forwards}"
 
 
-def render(client, managers_df, fetch_manager_teams, fetch_players, fetch_player_picks_from_raw=None):
+def render(client, managers_df, fetch_manager_teams, fetch_players, fetch_player_picks_from_raw=None, teams_dict=None):
     """Render the Formation Analysis tab"""
     st.header("⚽ Formation Analysis")
     st.write("Discover which formations are most profitable and how managers use different tactical setups")
@@ -433,7 +433,7 @@ def render(client, managers_df, fetch_manager_teams, fetch_players, fetch_player
         with st.spinner("Analyzing captain choices..."):
             try:
                 picks_df = fetch_player_picks_from_raw(client)
-                players_dict = fetch_players(client)
+                players_dict = get_lookups(teams_dict or {}, fetch_players(client)).players_by_id
                 
                 if not picks_df.empty and players_dict:
                     # Filter for captain picks only
@@ -550,7 +550,7 @@ def render(client, managers_df, fetch_manager_teams, fetch_players, fetch_player
                                     top_captains_by_pos.append({
                                         'Position': pos,
                                         'Player': player_info.get('web_name', f'Player {player_id}'),
-                                        'Team': player_info.get('team_name', 'Unknown'),
+                                        'Team': (teams_dict or {}).get(player_info.get('team_id'), 'Unknown'),
                                         'Times Captained': count,
                                         'Percentage': (count / len(captain_picks) * 100)
                                     })
@@ -17,14 +17,11 @@ def render(managers_df, client=None, fetch_transfer_data=None, fetch_players=Non
             transfers_df = fetch_transfer_data(client)
             # If we have transfers but no player names, add them
             if not transfers_df.empty and 'player_out_name' not in transfers_df.columns and fetch_players:
-                players_dict = fetch_players(client)
-                if players_dict:
-                    transfers_df['player_out_name'] = transfers_df['player_out_id'].apply(
-                        lambda x: players_dict.get(x, {}).get('web_name', 'Unknown')
-                    )
-                    transfers_df['player_in_name'] = transfers_df['player_in_id'].apply(
-                        lambda x: players_dict.get(x, {}).get('web_name', 'Unknown')
-                    )
+                players_df = fetch_players(client)
+                if not players_df.empty:
+                    web_names = players_df.set_index('external_id')['web_name']
+                    transfers_df['player_out_name'] = transfers_df['player_out_id'].map(web_names).fillna('Unknown')
+                    transfers_df['player_in_name'] = transfers_df['player_in_id'].map(web_names).fillna('Unknown')
         except:
             pass
     
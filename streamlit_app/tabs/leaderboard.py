@@ -5,9 +5,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from ..utils import fetch_executor, get_lookups
 
 
-def render(client, managers_df, fetch_current_gameweek, fetch_manager_teams,
+def render(client, managers_df, teams_dict, fetch_current_gameweek, fetch_manager_teams,
            fetch_performance_data, fetch_players, fetch_player_gameweek_points):
     """Render the Leaderboard tab"""
     st.header("League Leaderboard")
@@ -67,12 +68,12 @@ def render(client, managers_df, fetch_current_gameweek, fetch_manager_teams,
     # Gameweek insights section
     st.markdown("---")
     _render_gameweek_insights(
-        client, managers_df, fetch_current_gameweek, fetch_manager_teams,
+        client, managers_df, teams_dict, fetch_current_gameweek, fetch_manager_teams,
         fetch_performance_data, fetch_players, fetch_player_gameweek_points
     )
 
 
-def _render_gameweek_insights(client, managers_df, fetch_current_gameweek, 
+def _render_gameweek_insights(client, managers_df, teams_dict, fetch_current_gameweek, 
                               fetch_manager_teams, fetch_performance_data,
                               fetch_players, fetch_player_gameweek_points):
     """Render gameweek-specific insights"""
@@ -90,19 +91,23 @@ def _render_gameweek_insights(client, managers_df, fetch_current_gameweek,
     
     # Fetch all performance data for this gameweek
     all_performance = []
-    with st.spinner("Loading gameweek data..."):
-        for _, manager_row in managers_df.iterrows():
+    with st.spinner("Loading gameweek data..."), fetch_executor() as executor:
+        futures = [
+            (manager_name, external_id, executor.submit(fetch_performance_data, client, external_id))
+            for manager_name, external_id in managers_df[["manager_name", "external_id"]].itertuples(index=False, name=None)
+        ]
+        for manager_name, external_id, future in futures:
             try:
-                perf_df = fetch_performance_data(client, manager_row["external_id"])
+                perf_df = future.result()
                 if not perf_df.empty:
                     gw_perf = perf_df[perf_df["gameweek"] == gw_number]
                     if not gw_perf.empty:
                         perf_data = gw_perf.iloc[0].to_dict()
-                        perf_data["manager_name"] = manager_row["manager_name"]
-                        perf_data["manager_id"] = manager_row["external_id"]
+                        perf_data["manager_name"] = manager_name
+                        perf_data["manager_id"] = external_id
                         all_performance.append(perf_data)
-            except Exception:
-                continue
+            except Exception as e:
+                st.warning(f"⚠️ Skipping {manager_name}: {e}")
     
     if not all_performance:
         st.info(f"No performance data available for Gameweek {gw_number}")
@@ -113,6 +118,9 @@ def _render_gameweek_insights(client, managers_df, fetch_current_gameweek,
     # Fetch manager teams for captain and chip info
     manager_teams_df = fetch_manager_teams(client, gw_number)
     
+    # Player rows for captain names, built once and shared with the chip section
+    players_dict = get_lookups(teams_dict, fetch_players(client)).players_by_id
+    
     # Render insights
     col1, col2 = st.columns(2)
     
@@ -121,12 +129,12 @@ def _render_gameweek_insights(client, managers_df, fetch_current_gameweek,
     
     with col2:
         _render_captain_decisions(client, perf_df, manager_teams_df, 
-                                  fetch_players, fetch_player_gameweek_points, gw_number)
+                                  players_dict, fetch_player_gameweek_points, gw_number)
     
     # Chip usage in a separate row
     st.markdown("---")
     _render_chip_usage(client, perf_df, manager_teams_df, 
-                      fetch_players, fetch_player_gameweek_points, gw_number)
+                      players_dict, fetch_player_gameweek_points, gw_number)
 
 
 def _render_winner_loser(perf_df):
@@ -147,7 +155,7 @@ def _render_winner_loser(perf_df):
 
 
 def _render_captain_decisions(client, perf_df, manager_teams_df, 
-                              fetch_players, fetch_player_gameweek_points, gw_number):
+                              players_dict, fetch_player_gameweek_points, gw_number):
     """Render best and worst captain decisions"""
     st.markdown("### ⭐ Captain Decisions")
     
@@ -163,8 +171,7 @@ def _render_captain_decisions(client, perf_df, manager_teams_df,
         how="left"
     )
     
-    # Fetch players and their gameweek points
-    players_dict = fetch_players(client)
+    # Fetch player gameweek points
     player_gw_points = fetch_player_gameweek_points(client)
     
     if player_gw_points.empty:
@@ -236,7 +243,7 @@ def _render_captain_decisions(client, perf_df, manager_teams_df,
 
 
 def _render_chip_usage(client, perf_df, manager_teams_df, 
-                       fetch_players, fetch_player_gameweek_points, gw_number):
+                       players_dict, fetch_player_gameweek_points, gw_number):
     """Render chip usage separated by type"""
     st.markdown("### 🎴 Chip Usage This Gameweek")
     
@@ -262,8 +269,7 @@ def _render_chip_usage(client, perf_df, manager_teams_df,
     # Get unique chip types used
     chip_types = chip_users["active_chip"].unique()
     
-    # Fetch players and gameweek points for Triple Captain calculations
-    players_dict = fetch_players(client)
+    # Fetch gameweek points for Triple Captain calculations
     player_gw_points = fetch_player_gameweek_points(client)
     
     # Render each chip type separately
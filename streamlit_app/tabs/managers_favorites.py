@@ -2,10 +2,15 @@
 Manager's Favorites Tab - Team Preference and Performance Analysis
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from ..utils import apply_plotly_theme
+from ..utils import apply_plotly_theme, get_lookups
+
+
+# Teams below this share of a manager's points are grouped as "Other" in the pie chart
+PIE_OTHER_THRESHOLD = 0.01
 
 
 def render(client, managers_df, teams_dict, 
@@ -28,23 +33,26 @@ def render(client, managers_df, teams_dict,
         return
     
     betting_df = fetch_team_betting_data(client)
-    players_dict = fetch_players(client)
+    players_df = fetch_players(client)
     
     if not betting_df.empty and managers_df is not None and not managers_df.empty:
-        # Map team IDs to names
-        betting_df["team_name"] = betting_df["team_id"].map(teams_dict)
+        # Index managers by name once for direct lookups
+        managers_by_name = managers_df.drop_duplicates("manager_name").set_index("manager_name", drop=False)
         
-        # Map manager IDs to names
-        manager_id_to_name = dict(zip(managers_df["external_id"], managers_df["manager_name"]))
-        betting_df["manager_name"] = betting_df["manager_id"].map(manager_id_to_name)
+        # Filter for selected manager (single) before mapping names
+        selected_manager_id = managers_by_name.at[selected_manager, "external_id"]
+        betting_filtered = betting_df[betting_df["manager_id"] == selected_manager_id].copy()
         
-        # Filter for selected manager (single)
-        betting_filtered = betting_df[betting_df["manager_name"] == selected_manager]
+        # Map team IDs to names
+        betting_filtered["team_name"] = betting_filtered["team_id"].map(teams_dict)
+        betting_filtered["manager_name"] = selected_manager
         
         if not betting_filtered.empty:
+            lookups = get_lookups(teams_dict, players_df)
+            
             _render_overview(betting_filtered, selected_manager)
-            _render_team_performance(betting_filtered, selected_manager, get_team_color)
-            _render_manager_detail(client, managers_df, betting_filtered, players_dict, teams_dict,
+            _render_team_performance(betting_filtered, selected_manager, lookups.color_map)
+            _render_manager_detail(client, managers_by_name, betting_filtered, lookups, teams_dict,
                                   selected_manager, fetch_player_picks_from_raw, 
                                   fetch_player_gameweek_points, get_team_color, create_team_badge)
         else:
@@ -77,11 +85,15 @@ def _render_overview(betting_filtered, selected_manager):
     st.markdown("---")
 
 
-def _render_team_performance(betting_filtered, selected_manager, get_team_color):
+def _render_team_performance(betting_filtered, selected_manager, color_map):
     """Render team performance analysis"""
     st.subheader(f"🎯 {selected_manager}'s Team Performance: Most Picked vs Most Valuable")
     
-    team_summary = betting_filtered.groupby("team_name").agg({
+    # Only carry the aggregated columns into the groupby
+    summary_columns = ["team_name", "total_players_used", "total_points", "avg_points_per_player", "success_rate"]
+    team_summary = betting_filtered[summary_columns].astype({"team_name": "category"}).groupby(
+        "team_name", observed=True, sort=False
+    ).agg({
         "total_players_used": "sum",
         "total_points": "sum",
         "avg_points_per_player": "mean",
@@ -96,7 +108,7 @@ def _render_team_performance(betting_filtered, selected_manager, get_team_color)
     )
     
     # Add team colors
-    team_summary["color"] = team_summary["team_name"].apply(get_team_color)
+    team_summary["color"] = team_summary["team_name"].map(color_map)
     
     col1, col2 = st.columns(2)
     
@@ -148,36 +160,37 @@ def _render_team_performance(betting_filtered, selected_manager, get_team_color)
         apply_plotly_theme(fig)
         st.plotly_chart(fig)
     
-    # Value analysis insights
-    _render_value_insights(team_summary)
+    # Value analysis insights (top 5 of the already ranked top 10s)
+    _render_value_insights(
+        most_picked["team_name"].head(5).to_numpy(),
+        most_valuable["team_name"].head(5).to_numpy()
+    )
     
     st.markdown("---")
 
 
-def _render_value_insights(team_summary):
+def _render_value_insights(top_5_picked, top_5_valuable):
     """Render value analysis insights"""
     st.markdown("**💡 Insight: Are the most picked teams the most valuable?**")
     
-    top_5_picked = set(team_summary.nlargest(5, "total_players_used")["team_name"])
-    top_5_valuable = set(team_summary.nlargest(5, "points_per_selection")["team_name"])
-    overlap = top_5_picked.intersection(top_5_valuable)
+    overlap = np.intersect1d(top_5_picked, top_5_valuable)
     
     col1, col2, col3 = st.columns(3)
     with col1:
         st.info(f"**{len(overlap)}/5** top picked teams are also in top 5 most valuable")
     with col2:
-        undervalued = top_5_valuable - top_5_picked
-        if undervalued:
+        undervalued = np.setdiff1d(top_5_valuable, top_5_picked)
+        if undervalued.size:
             st.success(f"**Underutilized gems:** {', '.join(undervalued)}")
         else:
             st.success("**All valuable teams are being picked!**")
     with col3:
-        overvalued = top_5_picked - top_5_valuable
-        if overvalued:
+        overvalued = np.setdiff1d(top_5_picked, top_5_valuable)
+        if overvalued.size:
             st.warning(f"**Over-picked but lower value:** {', '.join(overvalued)}")
 
 
-def _render_manager_detail(client, managers_df, betting_filtered, players_dict, teams_dict,
+def _render_manager_detail(client, managers_by_name, betting_filtered, lookups, teams_dict,
                            selected_manager, fetch_player_picks_from_raw, 
                            fetch_player_gameweek_points, get_team_color, create_team_badge):
     """Render individual manager detail view
@@ -187,10 +200,12 @@ def _render_manager_detail(client, managers_df, betting_filtered, players_dict,
     """
     st.subheader(f"👤 {selected_manager}'s Team Preferences")
     
-    manager_data = betting_filtered[betting_filtered["manager_name"] == selected_manager]
+    manager_data = betting_filtered  # Already filtered to the selected manager in render()
     
     if not manager_data.empty:
         manager_data = manager_data.sort_values("total_points", ascending=False)
+        top_teams = manager_data.head(10).to_dict("records")
+        team_colors = [lookups.color_map.get(team) or get_team_color(team) for team in manager_data["team_name"]]
         
         # Display teams with top player
         st.markdown(f"**Top Teams by Total Points (with Star Performer):**")
@@ -202,8 +217,9 @@ def _render_manager_detail(client, managers_df, betting_filtered, players_dict,
             points_df = fetch_player_gameweek_points(client)
             top_players_by_team = {}
             
-            if not picks_df.empty and not points_df.empty and players_dict:
-                manager_entry_id = managers_df[managers_df["manager_name"] == selected_manager].iloc[0]["entry_id"]
+            players = lookups.players_df
+            if not picks_df.empty and not points_df.empty and not players.empty:
+                manager_entry_id = managers_by_name.at[selected_manager, "entry_id"]
                 manager_picks = picks_df[picks_df["manager_entry_id"] == manager_entry_id]
                 
                 if not manager_picks.empty:
@@ -215,32 +231,27 @@ def _render_manager_detail(client, managers_df, betting_filtered, players_dict,
                     )
                     
                     # Calculate adjusted points
-                    manager_picks_with_points["player_key"] = "player_" + manager_picks_with_points["player_id"].astype(str)
                     manager_picks_with_points["adjusted_points"] = manager_picks_with_points["total_points"] * manager_picks_with_points["multiplier"]
                     
-                    # Group by player and sum points
-                    player_totals = manager_picks_with_points.groupby("player_key")["adjusted_points"].sum().to_dict()
+                    # Attach each pick's team, keeping only known teams
+                    mpp = manager_picks_with_points.merge(players[["player_id", "team_id"]], on="player_id")
+                    mpp = mpp[mpp["team_id"].isin(list(teams_dict))]
                     
-                    # Find top player per team
-                    for player_key, total_points in player_totals.items():
-                        if player_key in players_dict:
-                            player_info = players_dict[player_key]
-                            team_id = player_info.get("team_id", "")
-                            
-                            if team_id in teams_dict:
-                                team_name = teams_dict[team_id]
-                                player_name = player_info["name"]
-                                
-                                if team_name not in top_players_by_team or total_points > top_players_by_team[team_name]["points"]:
-                                    top_players_by_team[team_name] = {
-                                        "name": player_name,
-                                        "points": total_points
-                                    }
+                    # Sum points per (team, player) and take the top player of each team
+                    team_totals = mpp.groupby(["team_id", "player_id"], observed=True)["adjusted_points"].sum().reset_index()
+                    winners = team_totals.loc[team_totals.groupby("team_id")["adjusted_points"].idxmax()]
+                    winners = winners.merge(players[["player_id", "name"]], on="player_id")
+                    
+                    top_players_by_team = {
+                        teams_dict[team_id]: {"name": player_name, "points": points}
+                        for team_id, player_name, points in zip(
+                            winners["team_id"], winners["name"], winners["adjusted_points"]
+                        )
+                    }
         
         # Display teams with their top player
-        for idx, (_, row) in enumerate(manager_data.head(10).iterrows()):
+        for idx, (row, team_color) in enumerate(zip(top_teams, team_colors)):
             team_name = row['team_name']
-            team_color = get_team_color(team_name)
             
             # Create a card-style display
             st.markdown(f"### {idx+1}. {team_name}")
@@ -288,12 +299,23 @@ def _render_manager_detail(client, managers_df, betting_filtered, players_dict,
             height=400
         )
         
-        # Pie chart
+        # Pie chart - collapse the long tail of low-scoring teams into "Other"
         st.markdown("**Points Distribution by Team:**")
+        points = manager_data["total_points"].to_numpy()
+        keep = points >= points.sum() * PIE_OTHER_THRESHOLD
+        labels = manager_data["team_name"].to_numpy()[keep].tolist()
+        values = points[keep].tolist()
+        colors = np.asarray(team_colors)[keep].tolist()
+        if not keep.all():
+            labels.append("Other")
+            values.append(int(points[~keep].sum()))
+            colors.append("#888888")
+        
         fig = go.Figure(data=[go.Pie(
-            labels=manager_data["team_name"],
-            values=manager_data["total_points"],
-            marker=dict(colors=[get_team_color(team) for team in manager_data["team_name"]]),
+            labels=labels,
+            values=values,
+            marker=dict(colors=colors),
+            sort=False,
             textinfo='label+percent',
             hovertemplate='<b>%{label}</b><br>Points: %{value}<br>Percentage: %{percent}<extra></extra>'
         )])
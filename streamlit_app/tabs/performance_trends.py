@@ -2,11 +2,13 @@
 Performance Trends Tab - Weekly Performance Analysis
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from ..utils import apply_plotly_theme
+from ..config import CACHE_TTL
+from ..utils import apply_plotly_theme, fetch_executor
 
 
 def render(client, managers_df, fetch_performance_data):
@@ -15,10 +17,11 @@ def render(client, managers_df, fetch_performance_data):
     
     try:
         # Manager selection at the top
+        manager_names = managers_df["manager_name"].tolist()
         selected_managers = st.multiselect(
             "Select Managers to Compare",
-            options=managers_df["manager_name"].tolist(),
-            default=managers_df["manager_name"].tolist()[:5] if len(managers_df) >= 5 else managers_df["manager_name"].tolist(),
+            options=manager_names,
+            default=manager_names[:5],
             help="Choose one or more managers to view their performance trends",
             key="performance_trends_managers"
         )
@@ -27,51 +30,45 @@ def render(client, managers_df, fetch_performance_data):
             st.info("Please select at least one manager to view their performance")
         else:
             # Fetch performance data for ALL managers (for accurate league ranking)
-            all_league_performance = []
-            selected_performance = []
+            league_key = tuple(sorted(zip(managers_df["manager_name"], managers_df["external_id"])))
             
             with st.spinner("Loading performance data..."):
-                for idx, row in managers_df.iterrows():
-                    manager_name = row["manager_name"]
-                    try:
-                        perf_df = fetch_performance_data(client, row["external_id"])
-                        if not perf_df.empty:
-                            perf_df["manager"] = manager_name
-                            all_league_performance.append(perf_df)
-                            
-                            # Also collect selected managers separately for display
-                            if manager_name in selected_managers:
-                                selected_performance.append(perf_df)
-                    except Exception as e:
-                        if manager_name in selected_managers:
-                            st.error(f"Error loading data for {manager_name}: {e}")
+                full_league_df, errors = _load_performance(client, fetch_performance_data, league_key)
             
-            if selected_performance:
-                combined_df = pd.concat(selected_performance, ignore_index=True)
-                full_league_df = pd.concat(all_league_performance, ignore_index=True) if all_league_performance else combined_df
-                
-                # Calculate additional metrics
-                combined_df = _calculate_metrics(combined_df)
-                
-                # Create tabs for different views
-                tab1, tab2, tab3, tab4 = st.tabs([
-                    "📊 Gameweek Points", 
-                    "📈 Cumulative Progress", 
-                    "🔄 Transfer Impact",
-                    "📉 Rank Movement"
-                ])
-                
-                with tab1:
-                    _render_gameweek_points(combined_df)
-                
-                with tab2:
-                    _render_cumulative_view(combined_df)
+            # Changing the selection only re-filters the cached league frame
+            selected_set = set(selected_managers)
+            for manager_name, error in errors.items():
+                if manager_name in selected_set:
+                    st.error(f"Error loading data for {manager_name}: {error}")
+            
+            combined_df = full_league_df
+            if not full_league_df.empty:
+                combined_df = full_league_df[full_league_df["manager"].isin(selected_set)]
+                combined_df = combined_df.assign(manager=combined_df["manager"].cat.remove_unused_categories())
+            
+            if not combined_df.empty:
+                # Shared manager order and colors so every view matches
+                managers_sorted = sorted(combined_df["manager"].unique().tolist())
+                colors = px.colors.qualitative.Plotly
+                color_map = {manager: colors[idx % len(colors)] for idx, manager in enumerate(managers_sorted)}
                 
-                with tab3:
-                    _render_transfer_analysis(combined_df)
+                # Only the selected view is rendered (st.tabs would run all four)
+                view = st.radio(
+                    "View",
+                    ["📊 Gameweek Points", "📈 Cumulative Progress", "🔄 Transfer Impact", "📉 Rank Movement"],
+                    horizontal=True,
+                    label_visibility="collapsed",
+                    key="performance_trends_view"
+                )
                 
-                with tab4:
-                    _render_rank_movement(combined_df, full_league_df)
+                if view == "📊 Gameweek Points":
+                    _render_gameweek_points(combined_df, managers_sorted, color_map)
+                elif view == "📈 Cumulative Progress":
+                    _render_cumulative_view(combined_df, color_map)
+                elif view == "🔄 Transfer Impact":
+                    _render_transfer_analysis(combined_df, managers_sorted, color_map)
+                else:
+                    _render_rank_movement(full_league_df, managers_sorted, color_map)
             else:
                 st.info("No performance data available for selected managers")
     
@@ -81,43 +78,104 @@ def render(client, managers_df, fetch_performance_data):
         st.code(traceback.format_exc())
 
 
+class _PartialLoad(Exception):
+    """Raised out of the cached loader so a load with failed managers is never cached"""
+    
+    def __init__(self, combined, errors):
+        super().__init__(f"{len(errors)} manager(s) failed to load")
+        self.combined = combined
+        self.errors = errors
+
+
+def _load_performance(client, fetch_performance_data, managers):
+    """Fetch and combine performance data for (manager_name, external_id) pairs
+    
+    Returns the combined frame and a dict of per-manager load errors. Only
+    complete loads are cached; after a failure the next rerun retries, and
+    managers that did load are cache hits in their fetcher.
+    """
+    try:
+        return _load_performance_cached(client, fetch_performance_data, managers), {}
+    except _PartialLoad as partial:
+        return partial.combined, partial.errors
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _load_performance_cached(_client, _fetch_performance_data, managers):
+    """Combined league frame; raises _PartialLoad if any manager failed"""
+    names = []
+    frames = []
+    errors = {}
+    
+    with fetch_executor() as executor:
+        # Fetch concurrently, but collect in manager order so colors stay stable
+        futures = [
+            (manager_name, executor.submit(_fetch_performance_data, _client, external_id))
+            for manager_name, external_id in managers
+        ]
+        for manager_name, future in futures:
+            try:
+                perf_df = future.result()
+                if not perf_df.empty:
+                    names.append(manager_name)
+                    frames.append(perf_df)
+            except Exception as e:
+                errors[manager_name] = str(e)
+    
+    if not frames:
+        combined = pd.DataFrame()
+        if errors:
+            raise _PartialLoad(combined, errors)
+        return combined
+    # Tag managers via concat keys rather than a column assignment per frame
+    combined = pd.concat(frames, keys=names, names=["manager", None]).reset_index(level=0).reset_index(drop=True)
+    combined["manager"] = combined["manager"].astype("category")
+    
+    # For each gameweek, rank ALL managers by total_points
+    combined["league_rank"] = combined.groupby("gameweek")["total_points"].rank(ascending=False, method="min").astype("int32")
+    
+    # Metrics are per-manager, so computing them once here lets selections reuse them
+    combined = _calculate_metrics(combined)
+    if errors:
+        raise _PartialLoad(combined, errors)
+    return combined
+
+
 def _calculate_metrics(df):
     """Calculate additional metrics for analysis"""
-    df = df.copy()
+    # sort_values returns a new frame, so no defensive copy is needed
+    df = df.sort_values(["manager", "gameweek"])
     
-    # Calculate rolling averages per manager
-    for manager in df["manager"].unique():
-        mask = df["manager"] == manager
-        df.loc[mask, "points_ma3"] = df.loc[mask, "points"].rolling(window=3, min_periods=1).mean()
-        df.loc[mask, "points_ma5"] = df.loc[mask, "points"].rolling(window=5, min_periods=1).mean()
+    # Calculate rolling averages per manager in one grouped pass per window
+    # Cast the narrow int points to float64 once rather than inside each window
+    points_by_manager = df["points"].astype("float64").groupby(df["manager"], observed=True, sort=False)
+    df["points_ma3"] = points_by_manager.rolling(window=3, min_periods=1).mean().reset_index(level=0, drop=True)
+    df["points_ma5"] = points_by_manager.rolling(window=5, min_periods=1).mean().reset_index(level=0, drop=True)
     
     # Calculate net points (after transfer cost)
-    df["net_points"] = df["points"] - df.get("transfer_cost", 0)
+    transfer_cost = df["transfer_cost"].to_numpy() if "transfer_cost" in df.columns else 0
+    df["net_points"] = np.subtract(df["points"].to_numpy(), transfer_cost)
     
     return df
 
 
-def _render_gameweek_points(combined_df):
-    """Render clean gameweek points comparison"""
-    st.subheader("Points Per Gameweek")
-    
-    # View options
-    col1, col2 = st.columns([3, 1])
-    with col2:
-        show_avg = st.checkbox("Show 3-week moving average", value=False, key="show_avg_gw")
-    
-    # Create the main points chart
+def _frame_hash(df, columns):
+    """Cheap content fingerprint used as the cache key for figure builders"""
+    return int(pd.util.hash_pandas_object(df[columns], index=False).sum())
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_points_fig(_df, df_hash, show_avg, color_map):
+    """Build the points-per-gameweek figure (cached on df_hash)"""
     fig = go.Figure()
     
-    colors = px.colors.qualitative.Plotly
-    managers = combined_df["manager"].unique()
+    sorted_df = _df.sort_values(["manager", "gameweek"])
     
-    for idx, manager in enumerate(managers):
-        manager_data = combined_df[combined_df["manager"] == manager].sort_values("gameweek")
-        color = colors[idx % len(colors)]
+    for manager, manager_data in sorted_df.groupby("manager", observed=True, sort=False):
+        color = color_map[manager]
         
         # Add main points line
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=manager_data["gameweek"],
             y=manager_data["points"],
             name=manager,
@@ -132,7 +190,7 @@ def _render_gameweek_points(combined_df):
         
         # Add moving average if selected
         if show_avg and "points_ma3" in manager_data.columns:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=manager_data["gameweek"],
                 y=manager_data["points_ma3"],
                 name=f"{manager} (3-wk avg)",
@@ -161,43 +219,65 @@ def _render_gameweek_points(combined_df):
     )
     
     apply_plotly_theme(fig)
+    return fig
+
+
+@st.fragment
+def _render_gameweek_points(combined_df, managers, color_map):
+    """Render clean gameweek points comparison
+    
+    Runs as a fragment so toggling the moving-average checkbox only reruns this chart.
+    """
+    st.subheader("Points Per Gameweek")
+    
+    # View options
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        show_avg = st.checkbox("Show 3-week moving average", value=False, key="show_avg_gw")
+    
+    fig = _build_points_fig(combined_df, _frame_hash(combined_df, ["manager", "gameweek", "points"]), show_avg, color_map)
     st.plotly_chart(fig)
     
     # Summary stats
     st.subheader("Gameweek Statistics")
+    stats = combined_df.groupby("manager", observed=True)["points"].agg(["mean", "std"])
     cols = st.columns(len(managers))
     for idx, manager in enumerate(managers):
         with cols[idx]:
-            manager_data = combined_df[combined_df["manager"] == manager]
             st.metric(
                 label=manager,
-                value=f"{manager_data['points'].mean():.1f}",
-                delta=f"±{manager_data['points'].std():.1f}",
+                value=f"{stats.at[manager, 'mean']:.1f}",
+                delta=f"±{stats.at[manager, 'std']:.1f}",
                 help=f"Average points per gameweek ± standard deviation"
             )
 
 
-def _render_cumulative_view(combined_df):
-    """Render cumulative points progression"""
-    st.subheader("Cumulative Points Over Season")
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_cumulative_fig(_df, df_hash, color_map):
+    """Build the cumulative points figure (cached on df_hash)"""
+    # Cumulative points chart - one WebGL trace per manager column of the pivot
+    totals = _df.pivot_table(index="gameweek", columns="manager", values="total_points", aggfunc="first", observed=True)
     
-    # Cumulative points chart
-    fig = px.line(
-        combined_df.sort_values(["manager", "gameweek"]),
-        x="gameweek",
-        y="total_points",
-        color="manager",
-        markers=True,
-        title="Cumulative Points Over Season",
-        labels={"total_points": "Total Points", "gameweek": "Gameweek"}
-    )
-    
-    fig.update_traces(
-        line=dict(width=3),
-        marker=dict(size=8)
-    )
+    fig = go.Figure()
+    for manager in totals.columns:
+        fig.add_trace(go.Scattergl(
+            x=totals.index,
+            y=totals[manager].to_numpy(),
+            name=manager,
+            mode="lines+markers",
+            line=dict(color=color_map[manager], width=3),
+            marker=dict(size=8),
+            connectgaps=True,
+            hovertemplate="<b>%{fullData.name}</b><br>" +
+                          "Gameweek: %{x}<br>" +
+                          "Total Points: %{y}<br>" +
+                          "<extra></extra>"
+        ))
     
     fig.update_layout(
+        title="Cumulative Points Over Season",
+        xaxis_title="Gameweek",
+        yaxis_title="Total Points",
         height=500,
         hovermode="x unified",
         legend=dict(
@@ -210,6 +290,14 @@ def _render_cumulative_view(combined_df):
     )
     
     apply_plotly_theme(fig)
+    return fig
+
+
+def _render_cumulative_view(combined_df, color_map):
+    """Render cumulative points progression"""
+    st.subheader("Cumulative Points Over Season")
+    
+    fig = _build_cumulative_fig(combined_df, _frame_hash(combined_df, ["manager", "gameweek", "total_points"]), color_map)
     st.plotly_chart(fig)
     
     # Points gaps
@@ -218,26 +306,23 @@ def _render_cumulative_view(combined_df):
     latest_standings = combined_df[combined_df["gameweek"] == latest_gw].sort_values("total_points", ascending=False)
     
     if not latest_standings.empty:
-        leader_points = latest_standings.iloc[0]["total_points"]
-        standings_data = []
-        
-        for idx, row in latest_standings.iterrows():
-            gap = row["total_points"] - leader_points
-            standings_data.append({
-                "Position": len(standings_data) + 1,
-                "Manager": row["manager"],
-                "Total Points": int(row["total_points"]),
-                "Gap to Leader": f"{gap:+d}" if gap != 0 else "—"
-            })
+        leader_points = latest_standings["total_points"].iloc[0]
+        gaps = latest_standings["total_points"] - leader_points
+        standings_data = pd.DataFrame({
+            "Position": range(1, len(latest_standings) + 1),
+            "Manager": latest_standings["manager"].to_numpy(),
+            "Total Points": latest_standings["total_points"].to_numpy(),
+            "Gap to Leader": gaps.map(lambda gap: f"{gap:+d}" if gap != 0 else "—").to_numpy()
+        })
         
         st.dataframe(
-            pd.DataFrame(standings_data),
+            standings_data,
             use_container_width=True,
             hide_index=True
         )
 
 
-def _render_transfer_analysis(combined_df):
+def _render_transfer_analysis(combined_df, managers, color_map):
     """Render transfer impact analysis"""
     st.subheader("Transfer Activity & Impact")
     
@@ -247,7 +332,7 @@ def _render_transfer_analysis(combined_df):
     with col1:
         # Transfer frequency
         st.markdown("#### Transfer Frequency")
-        transfer_summary = combined_df.groupby("manager").agg({
+        transfer_summary = combined_df.groupby("manager", observed=True).agg({
             "transfers": ["sum", "mean"],
             "transfer_cost": "sum"
         }).round(2)
@@ -257,7 +342,7 @@ def _render_transfer_analysis(combined_df):
     with col2:
         # Points efficiency
         st.markdown("#### Transfer Efficiency")
-        efficiency = combined_df.groupby("manager").agg({
+        efficiency = combined_df.groupby("manager", observed=True).agg({
             "points": "sum",
             "transfer_cost": "sum"
         })
@@ -273,41 +358,26 @@ def _render_transfer_analysis(combined_df):
     transfer_data = combined_df[combined_df["transfers"] > 0].copy()
     
     if not transfer_data.empty:
-        # Create scatter plot with sized markers
-        fig = go.Figure()
-        
-        colors = px.colors.qualitative.Plotly
-        managers = sorted(combined_df["manager"].unique())
-        
-        for idx, manager in enumerate(managers):
-            manager_transfers = transfer_data[transfer_data["manager"] == manager]
-            
-            if not manager_transfers.empty:
-                color = colors[idx % len(colors)]
-                
-                # Create marker sizes based on number of transfers
-                marker_sizes = manager_transfers["transfers"] * 15 + 10
-                
-                fig.add_trace(go.Scatter(
-                    x=manager_transfers["gameweek"],
-                    y=[manager] * len(manager_transfers),
-                    name=manager,
-                    mode="markers+text",
-                    marker=dict(
-                        size=marker_sizes,
-                        color=color,
-                        line=dict(color="white", width=2),
-                        opacity=0.8
-                    ),
-                    text=manager_transfers["transfers"].astype(str),
-                    textposition="middle center",
-                    textfont=dict(color="white", size=10, family="Arial Black"),
-                    hovertemplate="<b>%{fullData.name}</b><br>" +
-                                  "Gameweek: %{x}<br>" +
-                                  "Transfers: %{text}<br>" +
-                                  "<extra></extra>",
-                    showlegend=False
-                ))
+        # Single scatter trace for all managers, colored per manager
+        fig = go.Figure(go.Scatter(
+            x=transfer_data["gameweek"],
+            y=transfer_data["manager"],
+            mode="markers+text",
+            marker=dict(
+                size=transfer_data["transfers"].astype("int16") * 15 + 10,  # Larger markers for more transfers
+                color=transfer_data["manager"].map(color_map),
+                line=dict(color="white", width=2),
+                opacity=0.8
+            ),
+            text=transfer_data["transfers"].astype(str),
+            textposition="middle center",
+            textfont=dict(color="white", size=10, family="Arial Black"),
+            hovertemplate="<b>%{y}</b><br>" +
+                          "Gameweek: %{x}<br>" +
+                          "Transfers: %{text}<br>" +
+                          "<extra></extra>",
+            showlegend=False
+        ))
         
         fig.update_layout(
             title="",
@@ -335,34 +405,18 @@ def _render_transfer_analysis(combined_df):
         st.info("No transfers made in the selected gameweeks")
 
 
-def _render_rank_movement(combined_df, full_league_df):
-    """Render rank movement over time"""
-    st.subheader("League Rank Progression")
-    
-    # Calculate league rank based on ALL managers in the league
-    full_league_with_rank = full_league_df.copy()
-    
-    # For each gameweek, rank ALL managers by total_points
-    full_league_with_rank['league_rank'] = full_league_with_rank.groupby('gameweek')['total_points'].rank(
-        ascending=False, method='min'
-    ).astype(int)
-    
-    # Get total number of managers for context
-    total_managers = full_league_with_rank['manager'].nunique()
-    
-    st.caption(f"League positions out of {total_managers} managers")
-    
-    # Filter to only show selected managers
-    selected_managers = combined_df['manager'].unique()
-    df_with_rank = full_league_with_rank[full_league_with_rank['manager'].isin(selected_managers)].copy()
-    
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_rank_fig(_df, df_hash, color_map):
+    """Build the league rank progression figure (cached on df_hash)"""
     # Create the rank progression chart
     fig = px.line(
-        df_with_rank.sort_values(["manager", "gameweek"]),
+        _df,
         x="gameweek",
         y="league_rank",
         color="manager",
+        color_discrete_map=color_map,
         markers=True,
+        render_mode="webgl",
         title="League Rank Progression",
         labels={"league_rank": "League Position", "gameweek": "Gameweek"}
     )
@@ -388,44 +442,54 @@ def _render_rank_movement(combined_df, full_league_df):
     )
     
     apply_plotly_theme(fig)
+    return fig
+
+
+def _render_rank_movement(full_league_df, selected_managers, color_map):
+    """Render rank movement over time"""
+    st.subheader("League Rank Progression")
+    
+    # league_rank is computed across ALL managers by the cached loader
+    total_managers = full_league_df['manager'].nunique()
+    
+    st.caption(f"League positions out of {total_managers} managers")
+    
+    # Filter to only show selected managers
+    df_with_rank = full_league_df[full_league_df['manager'].isin(selected_managers)]
+    df_with_rank = df_with_rank.assign(manager=df_with_rank["manager"].cat.remove_unused_categories())
+    df_with_rank = df_with_rank.sort_values(["manager", "gameweek"])
+    df_with_rank["rank_change"] = df_with_rank.groupby("manager", observed=True, sort=False)["league_rank"].diff().mul(-1)
+    
+    fig = _build_rank_fig(df_with_rank, _frame_hash(df_with_rank, ["manager", "gameweek", "league_rank"]), color_map)
     st.plotly_chart(fig)
     
     # Rank changes
     st.subheader("Position Changes")
-    rank_changes = []
-    
-    for manager in df_with_rank["manager"].unique():
-        manager_data = df_with_rank[df_with_rank["manager"] == manager].sort_values("gameweek")
-        if len(manager_data) >= 2:
-            first_rank = manager_data.iloc[0]["league_rank"]
-            last_rank = manager_data.iloc[-1]["league_rank"]
-            change = first_rank - last_rank  # Positive = improved (moved up)
-            
-            # Find biggest single gameweek change
-            manager_data = manager_data.copy()
-            manager_data["rank_change"] = manager_data["league_rank"].diff() * -1
-            biggest_jump_idx = manager_data["rank_change"].abs().idxmax()
-            
-            if pd.notna(biggest_jump_idx):
-                biggest_jump = manager_data.loc[biggest_jump_idx]
-                best_jump_val = biggest_jump['rank_change']
-                best_jump_gw = int(biggest_jump['gameweek'])
-            else:
-                best_jump_val = 0
-                best_jump_gw = "N/A"
-            
-            rank_changes.append({
-                "Manager": manager,
-                "Overall Change": f"{change:+d}" if change != 0 else "—",
-                "Current Position": f"{int(last_rank)}/{total_managers}",
-                "Best Jump": f"{best_jump_val:+.0f}" if pd.notna(best_jump_val) and best_jump_val != 0 else "—",
-                "Best Jump GW": best_jump_gw if best_jump_val != 0 else "—"
-            })
-    
-    if rank_changes:
+    
+    # Managers need at least two gameweeks to have moved
+    gameweek_counts = df_with_rank.groupby("manager", observed=True, sort=False)["gameweek"].transform("size")
+    movable = df_with_rank[gameweek_counts >= 2]
+    rank_span = movable.groupby("manager", observed=True, sort=False)["league_rank"].agg(["first", "last"])
+    
+    # Biggest single gameweek change per manager
+    idx_best = movable.assign(absc=movable["rank_change"].abs().fillna(0)).groupby("manager", observed=True, sort=False)["absc"].idxmax()
+    best_jumps = movable.loc[idx_best, ["manager", "gameweek", "rank_change"]].set_index("manager")
+    
+    rank_span = rank_span.join(best_jumps)
+    change = rank_span["first"] - rank_span["last"]  # Positive = improved (moved up)
+    best_jump_val = rank_span["rank_change"].fillna(0)
+    
+    rank_changes = pd.DataFrame({
+        "Manager": rank_span.index,
+        "Overall Change": change.map(lambda c: f"{c:+d}" if c != 0 else "—").to_numpy(),
+        "Current Position": (rank_span["last"].astype(str) + f"/{total_managers}").to_numpy(),
+        "Best Jump": best_jump_val.map(lambda j: f"{j:+.0f}" if j != 0 else "—").to_numpy(),
+        "Best Jump GW": rank_span["gameweek"].astype(int).astype(object).where(best_jump_val != 0, "—").to_numpy()
+    })
+    
+    if not rank_changes.empty:
         st.dataframe(
-            pd.DataFrame(rank_changes).sort_values("Current Position"),
+            rank_changes.sort_values("Current Position"),
             use_container_width=True,
             hide_index=True
         )
-
@@ -2,12 +2,17 @@
 Transfer Analysis Tab - Transfer Success and ROI Analysis
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from ..utils import apply_plotly_theme
 
 
+# Cumulative impact lines are thinned to this many points
+MAX_LINE_POINTS = 500
+
+
 def render(client, managers_df, fetch_transfer_data, fetch_players):
     """Render the Transfer Analysis tab"""
     st.header("Transfer Success Analysis")
@@ -25,25 +30,29 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
         return
     
     transfer_df = fetch_transfer_data(client)
-    players_dict = fetch_players(client)
+    players_df = fetch_players(client)
     
     if not transfer_df.empty and managers_df is not None and not managers_df.empty:
-        # Map manager IDs to names
-        manager_id_to_name = dict(zip(managers_df["external_id"], managers_df["manager_name"]))
-        transfer_df["manager_name"] = transfer_df["manager_id"].map(manager_id_to_name)
+        # Filter for selected manager before any per-row work
+        selected_ids = managers_df.loc[managers_df["manager_name"] == selected_manager, "external_id"]
+        transfer_filtered = transfer_df[transfer_df["manager_id"].isin(selected_ids)].copy()
         
         # Map player IDs to names
-        transfer_df["player_in_name"] = transfer_df["player_in_id"].map(lambda x: players_dict.get(x, {}).get("name", "Unknown"))
-        transfer_df["player_out_name"] = transfer_df["player_out_id"].map(lambda x: players_dict.get(x, {}).get("name", "Unknown"))
-        
-        # Filter for selected manager
-        transfer_filtered = transfer_df[transfer_df["manager_name"] == selected_manager].copy()
+        name_by_id = dict(zip(players_df["external_id"], players_df["name"])) if not players_df.empty else {}
+        # Bar labels only need the players this manager actually traded
+        traded_ids = set(transfer_filtered["player_in_id"]).union(transfer_filtered["player_out_id"])
+        last_name_by_id = {player_id: _last_name(name_by_id.get(player_id)) for player_id in traded_ids}
+        transfer_filtered["player_in_name"] = transfer_filtered["player_in_id"].map(name_by_id).fillna("Unknown")
+        transfer_filtered["player_out_name"] = transfer_filtered["player_out_id"].map(name_by_id).fillna("Unknown")
         
         if not transfer_filtered.empty:
             # Sort by gameweek for time-series analysis
-            transfer_filtered = transfer_filtered.sort_values("gameweek")
-            # Key metrics
+            transfer_filtered = transfer_filtered.take(np.argsort(transfer_filtered["gameweek"].to_numpy(), kind="stable"))
+            # Key metrics (plain NumPy reductions on each column)
             col1, col2, col3, col4 = st.columns(4)
+            successful_transfers = int(transfer_filtered["was_successful"].to_numpy().sum())
+            avg_net_benefit = float(np.nanmean(transfer_filtered["net_benefit"].to_numpy(dtype="float64")))
+            total_cost = int(transfer_filtered["transfer_cost"].to_numpy().sum())
             
             with col1:
                 total_transfers = len(transfer_filtered)
@@ -54,7 +63,6 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
                 )
             
             with col2:
-                successful_transfers = transfer_filtered["was_successful"].sum()
                 success_rate = (successful_transfers / total_transfers * 100) if total_transfers > 0 else 0
                 st.metric(
                     "Successful Transfers",
@@ -63,7 +71,6 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
                 )
             
             with col3:
-                avg_net_benefit = transfer_filtered["net_benefit"].mean()
                 st.metric(
                     "Avg Net Benefit",
                     f"{avg_net_benefit:.1f} pts",
@@ -71,7 +78,6 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
                 )
             
             with col4:
-                total_cost = transfer_filtered["transfer_cost"].sum()
                 st.metric(
                     "Total Cost",
                     f"{total_cost} pts",
@@ -83,16 +89,26 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             st.write("What if you didn't make those transfers? This shows the running impact of your transfer decisions.")
             
             # Calculate cumulative impact
-            transfer_filtered['cumulative_benefit'] = transfer_filtered['net_benefit'].cumsum()
-            transfer_filtered['cumulative_cost'] = transfer_filtered['transfer_cost'].cumsum()
-            transfer_filtered['cumulative_net'] = transfer_filtered['cumulative_benefit'] - transfer_filtered['cumulative_cost']
+            cumulative = transfer_filtered[['net_benefit', 'transfer_cost']].fillna(0).to_numpy(dtype='float64').cumsum(axis=0)
+            cumulative_benefit = cumulative[:, 0]
+            cumulative_net = cumulative[:, 0] - cumulative[:, 1]
+            
+            # Plain arrays shared by every trace below
+            gameweeks = transfer_filtered['gameweek'].to_numpy()
+            net_benefit = transfer_filtered['net_benefit'].to_numpy()
+            
+            # Thin the lines for very active managers; the markers below keep every transfer
+            line_idx = slice(None)
+            if len(transfer_filtered) > MAX_LINE_POINTS:
+                line_idx = np.linspace(0, len(transfer_filtered) - 1, MAX_LINE_POINTS).astype(int)
+            line_gameweeks = gameweeks[line_idx]
             
             fig = go.Figure()
             
             # Add line for cumulative benefit (if you kept old players)
             fig.add_trace(go.Scatter(
-                x=transfer_filtered['gameweek'],
-                y=[0] * len(transfer_filtered),  # Baseline if no transfers
+                x=line_gameweeks,
+                y=np.zeros(len(line_gameweeks)),  # Baseline if no transfers
                 mode='lines',
                 name='No Transfers Made',
                 line=dict(color='rgba(128, 128, 128, 0.5)', width=2, dash='dash'),
@@ -101,8 +117,8 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             
             # Add line for cumulative benefit before costs
             fig.add_trace(go.Scatter(
-                x=transfer_filtered['gameweek'],
-                y=transfer_filtered['cumulative_benefit'],
+                x=line_gameweeks,
+                y=cumulative_benefit[line_idx],
                 mode='lines+markers',
                 name='Benefit (before costs)',
                 line=dict(color='rgba(100, 200, 255, 0.8)', width=2),
@@ -112,8 +128,8 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             
             # Add line for net benefit (after costs)
             fig.add_trace(go.Scatter(
-                x=transfer_filtered['gameweek'],
-                y=transfer_filtered['cumulative_net'],
+                x=line_gameweeks,
+                y=cumulative_net[line_idx],
                 mode='lines+markers',
                 name='Net Benefit (after costs)',
                 line=dict(color='rgba(0, 255, 150, 0.9)', width=3),
@@ -124,10 +140,21 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
                 ))
             
             # Add markers for individual transfers
-            colors = ['green' if x > 0 else 'red' for x in transfer_filtered['net_benefit']]
+            colors = np.where(net_benefit > 0, 'green', 'red').tolist()
+            hovertext = [
+                f"<b>GW {gw}</b><br>Transfer: {out_name} → {in_name}<br>"
+                f"Net benefit this GW: {benefit:.1f} pts<br>Cumulative: {running_net:.1f} pts"
+                for gw, out_name, in_name, benefit, running_net in zip(
+                    gameweeks,
+                    transfer_filtered['player_out_name'].to_numpy(),
+                    transfer_filtered['player_in_name'].to_numpy(),
+                    net_benefit,
+                    cumulative_net
+                )
+            ]
             fig.add_trace(go.Scatter(
-                x=transfer_filtered['gameweek'],
-                y=transfer_filtered['cumulative_net'],
+                x=gameweeks,
+                y=cumulative_net,
                 mode='markers',
                 name='Transfer Points',
                 marker=dict(
@@ -136,19 +163,19 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
                     symbol='circle',
                     line=dict(width=1, color='white')
                 ),
-                hovertemplate='<b>GW %{x}</b><br>' +
-                             'Transfer: ' + transfer_filtered['player_out_name'] + ' → ' + transfer_filtered['player_in_name'] + '<br>' +
-                             'Net benefit this GW: ' + transfer_filtered['net_benefit'].apply(lambda x: f'{x:.1f}') + ' pts<br>' +
-                             'Cumulative: %{y:.1f} pts<extra></extra>',
+                text=hovertext,
+                hovertemplate='%{text}<extra></extra>',
                 showlegend=False
             ))
             
             fig.update_layout(
+                uirevision=selected_manager,
                 title=f"Transfer Impact: {selected_manager}",
                 xaxis_title="Gameweek",
                 yaxis_title="Cumulative Points Impact",
                 height=500,
                 hovermode='x unified',
+                spikedistance=0,
                 legend=dict(
                     orientation="h",
                     yanchor="bottom",
@@ -161,10 +188,10 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             fig.update_xaxes(dtick=1)
             
             apply_plotly_theme(fig)
-            st.plotly_chart(fig)
+            st.plotly_chart(fig, key="transfer_impact_chart")
             
             # Summary interpretation
-            final_net = transfer_filtered['cumulative_net'].iloc[-1]
+            final_net = cumulative_net[-1]
             if final_net > 0:
                 st.success(f"✅ Overall, {selected_manager}'s transfers gained **{final_net:.1f} points** compared to not transferring!")
             elif final_net < 0:
@@ -174,7 +201,7 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             
             # All transfers detail
             st.subheader("Transfer History")
-            recent_transfers = transfer_filtered.sort_values("gameweek", ascending=False)
+            recent_transfers = transfer_filtered.iloc[::-1]
             
             display_transfers = recent_transfers[[
                 "gameweek", "player_out_name", "player_in_name",
@@ -186,18 +213,15 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             ]
             
             # Add visual indicators
-            display_transfers["Success"] = display_transfers["Success"].apply(
-                lambda x: "✅" if x else "❌"
-            )
+            display_transfers["Success"] = np.where(display_transfers["Success"].astype(bool).to_numpy(), "✅", "❌")
             
             st.dataframe(
-                display_transfers.style.format({
-                    "Benefit": "{:.0f}",
-                    "Cost": "{:.0f}"
-                }).apply(
-                    lambda x: ['background-color: #d4edda' if v == "✅" else 'background-color: #f8d7da' 
-                               for v in x], subset=["Success"]
-                ),
+                display_transfers,
+                column_config={
+                    "Benefit": st.column_config.NumberColumn(format="%.0f"),
+                    "Cost": st.column_config.NumberColumn(format="%.0f"),
+                    "Success": st.column_config.TextColumn()
+                },
                 use_container_width=True,
                 height=400
             )
@@ -206,27 +230,31 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             st.subheader("Individual Transfer Performance")
             
             # Prepare data with labels
-            transfer_sorted = transfer_filtered.sort_values('net_benefit', ascending=True)
-            transfer_sorted['transfer_label'] = (
-                'GW' + transfer_sorted['gameweek'].astype(str) + ': ' + 
-                transfer_sorted['player_in_name'].apply(lambda x: x.split()[-1] if x != 'Unknown' else 'Unknown') +
-                ' (out: ' + transfer_sorted['player_out_name'].apply(lambda x: x.split()[-1] if x != 'Unknown' else 'Unknown') + ')'
-            )
+            transfer_sorted = transfer_filtered.take(np.argsort(transfer_filtered['net_benefit'].to_numpy(), kind='stable'))
+            transfer_sorted['transfer_label'] = [
+                f"GW{gw}: {last_name_by_id.get(in_id, 'Unknown')} (out: {last_name_by_id.get(out_id, 'Unknown')})"
+                for gw, in_id, out_id in zip(
+                    transfer_sorted['gameweek'].to_numpy(),
+                    transfer_sorted['player_in_id'].to_numpy(),
+                    transfer_sorted['player_out_id'].to_numpy()
+                )
+            ]
             
             fig = go.Figure()
             
             # Create horizontal bar chart
-            colors = ['rgba(239, 68, 68, 0.8)' if x < 0 else 'rgba(34, 197, 94, 0.8)' for x in transfer_sorted['net_benefit']]
+            sorted_benefit = transfer_sorted['net_benefit'].to_numpy()
+            colors = np.where(sorted_benefit < 0, 'rgba(239, 68, 68, 0.8)', 'rgba(34, 197, 94, 0.8)').tolist()
             
             fig.add_trace(go.Bar(
                 y=transfer_sorted['transfer_label'],
-                x=transfer_sorted['net_benefit'],
+                x=sorted_benefit,
                 orientation='h',
                 marker=dict(
                     color=colors,
                     line=dict(color='rgba(255,255,255,0.3)', width=1)
                 ),
-                text=transfer_sorted['net_benefit'].apply(lambda x: f"{x:+.0f} pts"),
+                text=[f"{x:+.0f} pts" for x in sorted_benefit],
                 textposition='outside',
                 textfont=dict(size=11, color='white'),
                 hovertemplate='<b>%{y}</b><br>Net benefit: %{x:.1f} pts<extra></extra>',
@@ -242,6 +270,7 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             )
             
             fig.update_layout(
+                uirevision=selected_manager,
                 title=f"All Transfers Ranked by Performance",
                 xaxis_title="Net Benefit (points)",
                 yaxis_title="",
@@ -255,7 +284,7 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
             )
             
             apply_plotly_theme(fig)
-            st.plotly_chart(fig)
+            st.plotly_chart(fig, key="transfer_performance_chart")
             
         else:
             st.info(f"No transfer data available for {selected_manager}")
@@ -268,3 +297,8 @@ def render(client, managers_df, fetch_transfer_data, fetch_players):
         3. Refresh this dashboard
         """)
 
+
+def _last_name(name):
+    """Last word of a player's name, or "Unknown" when the name is missing or blank"""
+    words = name.split() if isinstance(name, str) else []
+    return words[-1] if words else "Unknown"
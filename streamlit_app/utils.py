@@ -1,11 +1,26 @@
 """
 Utility functions for Fantasy Football Dashboard
 """
+import contextlib
+import functools
+import hashlib
+import logging
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
 import streamlit as st
+import numpy as np
 import pandas as pd
+import orjson
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from cognite.client import CogniteClient
 from cognite.client.config import ClientConfig
 from cognite.client.credentials import OAuthClientCredentials
+from cognite.client.data_classes import filters
 from cognite.client.data_classes.data_modeling.ids import ViewId
 import os
 from dotenv import load_dotenv
@@ -14,12 +29,83 @@ from .config import (
     PREMIER_LEAGUE_COLORS, SPACE, VERSION,
     MANAGER_VIEW, GAMEWEEK_PERF_VIEW, TEAM_BETTING_VIEW,
     TEAM_VIEW, TRANSFER_VIEW, PLAYER_VIEW, MANAGER_TEAM_VIEW,
-    GAMEWEEK_VIEW, FIXTURE_VIEW, CACHE_TTL, PLOTLY_THEME
+    GAMEWEEK_VIEW, FIXTURE_VIEW, CACHE_TTL, CACHE_DIR, FETCH_MAX_WORKERS,
+    NODE_PAGE_SIZE, PLOTLY_THEME
 )
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Views read by the fetchers
+_MANAGER_VIEW_ID = ViewId(space=SPACE, external_id=MANAGER_VIEW, version=VERSION)
+_GAMEWEEK_PERF_VIEW_ID = ViewId(space=SPACE, external_id=GAMEWEEK_PERF_VIEW, version=VERSION)
+_TEAM_BETTING_VIEW_ID = ViewId(space=SPACE, external_id=TEAM_BETTING_VIEW, version=VERSION)
+_TEAM_VIEW_ID = ViewId(space=SPACE, external_id=TEAM_VIEW, version=VERSION)
+_TRANSFER_VIEW_ID = ViewId(space=SPACE, external_id=TRANSFER_VIEW, version=VERSION)
+_PLAYER_VIEW_ID = ViewId(space=SPACE, external_id=PLAYER_VIEW, version=VERSION)
+_GAMEWEEK_VIEW_ID = ViewId(space=SPACE, external_id=GAMEWEEK_VIEW, version=VERSION)
+_MANAGER_TEAM_VIEW_ID = ViewId(space=SPACE, external_id=MANAGER_TEAM_VIEW, version=VERSION)
+_FIXTURE_VIEW_ID = ViewId(space=SPACE, external_id=FIXTURE_VIEW, version=VERSION)
+
+# Compact dtypes applied by the fetchers (keeps cached frames small)
+_MANAGER_DTYPES = {
+    "overall_points": "int32",
+    "overall_rank": "int32",
+    "league_rank": "int32",
+    "total_transfers": "int16"
+}
+_PERFORMANCE_DTYPES = {
+    "gameweek": "int8",
+    "points": "int16",
+    "total_points": "int32",
+    "rank": "int32",
+    "gameweek_rank": "int32",
+    "transfers": "int8",
+    "transfer_cost": "int16"
+}
+_TRANSFER_DTYPES = {
+    "gameweek": "int8",
+    "transfer_cost": "int16",
+    "was_successful": "bool"
+}
+_BETTING_DTYPES = {
+    "total_players_used": "int32",
+    "total_points": "int32",
+    "avg_points_per_player": "float32",
+    "success_rate": "float32"
+}
+_PLAYER_DTYPES = {
+    "position": "category",
+    "total_points": "int32"
+}
+_PLAYER_POINTS_DTYPES = {
+    "player_id": "int32",
+    "gameweek": "int8",
+    "total_points": "int16",
+    "minutes": "int16",
+    "goals_scored": "int16",
+    "assists": "int16"
+}
+_PICKS_DTYPES = {
+    "manager_entry_id": "int32",
+    "gameweek": "int8",
+    "player_id": "int32",
+    "multiplier": "int8",
+    "is_captain": "bool",
+    "is_vice_captain": "bool",
+    "position": "int8"
+}
+_MANAGER_TEAM_DTYPES = {
+    "gameweek": "int8",
+    "active_chip": "category",
+    "total_points": "int32"
+}
+_FIXTURE_DTYPES = {
+    "gameweek": "int8"
+}
+
 
 @st.cache_resource
 def get_cdf_client():
@@ -58,327 +144,363 @@ def get_cdf_client():
     return CogniteClient(cnf)
 
 
+def _attach_script_run_ctx(ctx):
+    """Attach the current Streamlit session to a worker thread"""
+    add_script_run_ctx(threading.current_thread(), ctx)
+
+
+def fetch_executor(max_workers=FETCH_MAX_WORKERS):
+    """Thread pool for running blocking CDF fetches concurrently.
+    
+    Workers share the calling session's script context so cached fetchers
+    and st.* calls behave as they do on the main thread.
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=_attach_script_run_ctx,
+        initargs=(get_script_run_ctx(),)
+    )
+
+
+def _iter_nodes(client, view_id, filter=None):
+    """Stream every node of a view from CDF, one page at a time"""
+    for page in client.data_modeling.instances(
+        chunk_size=NODE_PAGE_SIZE,
+        instance_type="node",
+        sources=[view_id],
+        filter=filter,
+        limit=None
+    ):
+        yield from page
+
+
+def _gameweek_number(external_id, marker="_"):
+    """Trailing gameweek number of an external id ("gameweek_12" -> 12), or 0"""
+    number = external_id.rpartition(marker)[2]
+    return int(number) if number.isdigit() else 0
+
+
+def _extract_props(node, view_id):
+    """Return a node's properties for one view, or {} if absent"""
+    properties = getattr(node, "properties", None)
+    if properties is None:
+        return {}
+    try:
+        # Look up by ViewId directly rather than dump() the whole properties object
+        return properties.get(view_id, {})
+    except Exception:
+        return {}
+
+
+@dataclass(frozen=True)
+class _FetchFailed:
+    """Returned by a fetcher when its CDF call fails: the error to show and the empty result"""
+    message: str
+    empty: object
+
+
+class FetchError(Exception):
+    """Raised by a strict fetcher when its CDF call fails and there is no saved copy"""
+
+
+# Marks a cache file that is missing or unreadable (None is a valid saved result)
+_MISSING = object()
+
+
+def _read_cache_file(path, as_frame):
+    """Load a saved result, or _MISSING if there isn't a readable one"""
+    try:
+        if as_frame:
+            return pd.read_parquet(path)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return _MISSING
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable cache file %s: %s", path, e)
+        return _MISSING
+
+
+def _write_cache_file(path, result, as_frame):
+    """Save a fetched result atomically (best effort)"""
+    directory = os.path.dirname(path)
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            if as_frame:
+                result.to_parquet(f)
+            else:
+                f.write(orjson.dumps(result))
+        os.replace(tmp_path, path)
+    except (OSError, ValueError, TypeError, NotImplementedError) as e:
+        logger.warning("Could not save cache file %s: %s", path, e)
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
+def _disk_cache(ttl=CACHE_TTL, as_frame=True, strict=False):
+    """Persist a fetcher's result under CACHE_DIR so a restarted process starts warm.
+    
+    Frames are saved as parquet, anything else as JSON, keyed on the CDF project
+    and the call arguments. Only when the fetcher returns _FetchFailed is the
+    last saved result served instead, however old; real empty results are kept.
+    With no saved result a strict fetcher raises FetchError, so neither cache
+    keeps the failure and the caller can report it; others show an error and
+    return the empty result.
+    """
+    def decorator(func):
+        suffix = "parquet" if as_frame else "json"
+        
+        @functools.wraps(func)
+        def wrapper(_client, *args, **kwargs):
+            call = (_client.config.project, _client.config.base_url, args, sorted(kwargs.items()))
+            key = hashlib.md5(repr(call).encode(), usedforsecurity=False).hexdigest()
+            path = os.path.join(os.path.expanduser(CACHE_DIR), f"{func.__name__}_{key}.{suffix}")
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+                cached = _read_cache_file(path, as_frame)
+                if cached is not _MISSING:
+                    return cached
+            
+            result = func(_client, *args, **kwargs)
+            if not isinstance(result, _FetchFailed):
+                _write_cache_file(path, result, as_frame)
+                return result
+            
+            stale = _read_cache_file(path, as_frame)
+            if stale is _MISSING:
+                if strict:
+                    raise FetchError(result.message)
+                st.error(result.message)
+                return result.empty
+            st.warning(f"⚠️ Showing saved data from {time.ctime(os.path.getmtime(path))}. {result.message}")
+            return stale
+        return wrapper
+    return decorator
+
+
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_managers(_client):
     """Fetch all managers from CDF"""
     try:
-        manager_view = ViewId(space=SPACE, external_id=MANAGER_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[manager_view],
-            limit=100
-        )
+        nodes = _iter_nodes(_client, _MANAGER_VIEW_ID)
         
-        managers = []
+        managers = defaultdict(list)
         for node in nodes:
             if not node.external_id.startswith("manager_"):
                 continue
                 
-            if hasattr(node, 'properties') and node.properties is not None:
-                try:
-                    if hasattr(node.properties, 'dump'):
-                        props_dict = node.properties.dump()
-                    else:
-                        props_dict = node.properties
-                    
-                    if isinstance(props_dict, dict):
-                        props = props_dict.get(SPACE, {})
-                        if isinstance(props, dict):
-                            props = props.get(f"{MANAGER_VIEW}/{VERSION}", {})
-                    else:
-                        props = {}
-                except Exception:
-                    props = {}
-                
-                if props and isinstance(props, dict):
-                    managers.append({
-                        "external_id": node.external_id,
-                        "entry_id": props.get("entryId"),
-                        "manager_name": props.get("managerName", "Unknown"),
-                        "team_name": props.get("teamName", ""),
-                        "overall_points": props.get("overallPoints", 0),
-                        "overall_rank": props.get("overallRank", 0),
-                        "league_rank": props.get("leagueRank", 0),
-                        "team_value": props.get("teamValue", 0),
-                        "consistency_score": props.get("consistencyScore", 0),
-                        "avg_points_per_week": props.get("averagePointsPerWeek", 0),
-                        "points_std_dev": props.get("pointsStdDev", 0),
-                        "team_value_growth": props.get("teamValueGrowth", 0),
-                        "total_transfers": props.get("totalTransfers", 0)
-                    })
+            props = _extract_props(node, _MANAGER_VIEW_ID)
+            if props:
+                managers["external_id"].append(node.external_id)
+                managers["entry_id"].append(props.get("entryId"))
+                managers["manager_name"].append(props.get("managerName", "Unknown"))
+                managers["team_name"].append(props.get("teamName", ""))
+                managers["overall_points"].append(props.get("overallPoints", 0))
+                managers["overall_rank"].append(props.get("overallRank", 0))
+                managers["league_rank"].append(props.get("leagueRank", 0))
+                managers["team_value"].append(props.get("teamValue", 0))
+                managers["consistency_score"].append(props.get("consistencyScore", 0))
+                managers["avg_points_per_week"].append(props.get("averagePointsPerWeek", 0))
+                managers["points_std_dev"].append(props.get("pointsStdDev", 0))
+                managers["team_value_growth"].append(props.get("teamValueGrowth", 0))
+                managers["total_transfers"].append(props.get("totalTransfers", 0))
         
-        return pd.DataFrame(managers)
+        return downcast(pd.DataFrame(managers), _MANAGER_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching managers: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching managers: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache(strict=True)
 def fetch_performance_data(_client, manager_external_id):
-    """Fetch gameweek performance for a manager"""
+    """Fetch gameweek performance for a manager (raises FetchError on failure)"""
     try:
-        perf_view = ViewId(space=SPACE, external_id=GAMEWEEK_PERF_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[perf_view],
-            limit=1000
-        )
+        # Only this manager's gameweeks are sent back, not the whole league's
+        manager_prefix = f"performance_{manager_external_id.split('_')[1]}_"
+        nodes = _iter_nodes(_client, _GAMEWEEK_PERF_VIEW_ID, filters.Prefix(["node", "externalId"], manager_prefix))
         
-        performance = []
+        performance = defaultdict(list)
         for node in nodes:
-            if not node.external_id.startswith(f"performance_{manager_external_id.split('_')[1]}_"):
-                continue
-                
-            if hasattr(node, 'properties') and node.properties is not None:
-                try:
-                    if hasattr(node.properties, 'dump'):
-                        props_dict = node.properties.dump()
-                    else:
-                        props_dict = node.properties
-                    
-                    if isinstance(props_dict, dict):
-                        props = props_dict.get(SPACE, {})
-                        if isinstance(props, dict):
-                            props = props.get(f"{GAMEWEEK_PERF_VIEW}/{VERSION}", {})
-                    else:
-                        props = {}
-                except Exception:
-                    props = {}
-                
-                if props and isinstance(props, dict):
-                    gw_num = node.external_id.split("_gw")[-1]
-                    performance.append({
-                        "gameweek": int(gw_num) if gw_num.isdigit() else 0,
-                        "points": props.get("points", 0),
-                        "total_points": props.get("totalPoints", 0),
-                        "rank": props.get("rank", 0),
-                        "gameweek_rank": props.get("gameweekRank", 0),
-                        "transfers": props.get("transfers", 0),
-                        "transfer_cost": props.get("transferCost", 0)
-                    })
+            props = _extract_props(node, _GAMEWEEK_PERF_VIEW_ID)
+            if props:
+                performance["gameweek"].append(_gameweek_number(node.external_id, "_gw"))
+                performance["points"].append(props.get("points", 0))
+                performance["total_points"].append(props.get("totalPoints", 0))
+                performance["rank"].append(props.get("rank", 0))
+                performance["gameweek_rank"].append(props.get("gameweekRank", 0))
+                performance["transfers"].append(props.get("transfers", 0))
+                performance["transfer_cost"].append(props.get("transferCost", 0))
         
-        df = pd.DataFrame(performance)
+        df = downcast(pd.DataFrame(performance), _PERFORMANCE_DTYPES)
         if not df.empty:
-            df = df.sort_values("gameweek")
+            df = df.sort_values("gameweek", kind="stable", ignore_index=True)
         return df
     except Exception as e:
-        st.error(f"Error fetching performance data: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching performance data: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_team_betting_data(_client):
     """Fetch team betting patterns"""
     try:
-        betting_view = ViewId(space=SPACE, external_id=TEAM_BETTING_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[betting_view],
-            limit=1000
-        )
+        nodes = _iter_nodes(_client, _TEAM_BETTING_VIEW_ID)
         
-        betting_data = []
+        betting_data = defaultdict(list)
         for node in nodes:
             if not node.external_id.startswith("betting_"):
                 continue
                 
-            if hasattr(node, 'properties') and node.properties is not None:
-                try:
-                    if hasattr(node.properties, 'dump'):
-                        props_dict = node.properties.dump()
-                    else:
-                        props_dict = node.properties
-                    
-                    if isinstance(props_dict, dict):
-                        props = props_dict.get(SPACE, {})
-                        if isinstance(props, dict):
-                            props = props.get(f"{TEAM_BETTING_VIEW}/{VERSION}", {})
-                    else:
-                        props = {}
-                except Exception:
-                    props = {}
+            props = _extract_props(node, _TEAM_BETTING_VIEW_ID)
+            if props:
+                manager_id = props.get("manager", {}).get("externalId", "")
+                team_id = props.get("plTeam", {}).get("externalId", "")
                 
-                if props and isinstance(props, dict):
-                    manager_id = props.get("manager", {}).get("externalId", "")
-                    team_id = props.get("plTeam", {}).get("externalId", "")
-                    
-                    betting_data.append({
-                        "manager_id": manager_id,
-                        "team_id": team_id,
-                        "total_players_used": props.get("totalPlayersUsed", 0),
-                        "total_points": props.get("totalPoints", 0),
-                        "avg_points_per_player": props.get("averagePointsPerPlayer", 0),
-                        "success_rate": props.get("successRate", 0)
-                    })
+                betting_data["manager_id"].append(manager_id)
+                betting_data["team_id"].append(team_id)
+                betting_data["total_players_used"].append(props.get("totalPlayersUsed", 0))
+                betting_data["total_points"].append(props.get("totalPoints", 0))
+                betting_data["avg_points_per_player"].append(props.get("averagePointsPerPlayer", 0))
+                betting_data["success_rate"].append(props.get("successRate", 0))
         
-        return pd.DataFrame(betting_data)
+        return downcast(pd.DataFrame(betting_data), _BETTING_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching team betting data: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching team betting data: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache(as_frame=False)
 def fetch_teams(_client):
-    """Fetch Premier League teams"""
+    """Fetch Premier League teams as a {team external_id: name} dict.
+    
+    Kept as a dict rather than a frame: it is a ~20-entry lookup that callers
+    only map through (Series.map, teams_dict[team_id]), never filter or group.
+    """
     try:
-        team_view = ViewId(space=SPACE, external_id=TEAM_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[team_view],
-            limit=100
-        )
+        nodes = _iter_nodes(_client, _TEAM_VIEW_ID)
         
         teams = {}
         for node in nodes:
             if not node.external_id.startswith("team_"):
                 continue
                 
-            if hasattr(node, 'properties') and node.properties is not None:
-                try:
-                    if hasattr(node.properties, 'dump'):
-                        props_dict = node.properties.dump()
-                    else:
-                        props_dict = node.properties
-                    
-                    if isinstance(props_dict, dict):
-                        props = props_dict.get(SPACE, {})
-                        if isinstance(props, dict):
-                            props = props.get(f"{TEAM_VIEW}/{VERSION}", {})
-                    else:
-                        props = {}
-                except Exception:
-                    props = {}
-                
-                if props and isinstance(props, dict):
-                    teams[node.external_id] = props.get("name", "Unknown Team")
+            props = _extract_props(node, _TEAM_VIEW_ID)
+            if props:
+                teams[node.external_id] = props.get("name", "Unknown Team")
         
         return teams
     except Exception as e:
-        st.error(f"Error fetching teams: {e}")
-        return {}
+        return _FetchFailed(f"Error fetching teams: {e}", {})
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_transfer_data(_client):
     """Fetch transfer data with success metrics"""
     try:
-        transfer_view = ViewId(space=SPACE, external_id=TRANSFER_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[transfer_view],
-            limit=2000
-        )
+        nodes = _iter_nodes(_client, _TRANSFER_VIEW_ID)
         
-        transfers = []
+        transfers = defaultdict(list)
         for node in nodes:
-            if hasattr(node, 'properties'):
-                props_dict = node.properties.dump() if hasattr(node.properties, 'dump') else node.properties
-                props = props_dict.get(SPACE, {}).get(f"{TRANSFER_VIEW}/{VERSION}", {})
-                if props:
-                    manager_id = props.get("manager", {}).get("externalId", "")
-                    gameweek_id = props.get("gameweek", {}).get("externalId", "")
-                    player_in_id = props.get("playerIn", {}).get("externalId", "")
-                    player_out_id = props.get("playerOut", {}).get("externalId", "")
-                    
-                    gw_num = gameweek_id.split("_")[-1] if gameweek_id else "0"
-                    
-                    transfers.append({
-                        "external_id": node.external_id,
-                        "manager_id": manager_id,
-                        "gameweek": int(gw_num) if gw_num.isdigit() else 0,
-                        "player_in_id": player_in_id,
-                        "player_out_id": player_out_id,
-                        "transfer_cost": props.get("transferCost", 0),
-                        "player_in_price": props.get("playerInPrice", 0),
-                        "player_out_price": props.get("playerOutPrice", 0),
-                        "points_gained_next_3gw": props.get("pointsGainedNext3GW", 0),
-                        "was_successful": props.get("wasSuccessful", False),
-                        "net_benefit": props.get("netBenefit", 0)
-                    })
+            props = _extract_props(node, _TRANSFER_VIEW_ID)
+            if props:
+                manager_id = props.get("manager", {}).get("externalId", "")
+                gameweek_id = props.get("gameweek", {}).get("externalId", "")
+                player_in_id = props.get("playerIn", {}).get("externalId", "")
+                player_out_id = props.get("playerOut", {}).get("externalId", "")
+                
+                transfers["external_id"].append(node.external_id)
+                transfers["manager_id"].append(manager_id)
+                transfers["gameweek"].append(_gameweek_number(gameweek_id))
+                transfers["player_in_id"].append(player_in_id)
+                transfers["player_out_id"].append(player_out_id)
+                transfers["transfer_cost"].append(props.get("transferCost", 0))
+                transfers["player_in_price"].append(props.get("playerInPrice", 0))
+                transfers["player_out_price"].append(props.get("playerOutPrice", 0))
+                transfers["points_gained_next_3gw"].append(props.get("pointsGainedNext3GW", 0))
+                transfers["was_successful"].append(props.get("wasSuccessful", False))
+                transfers["net_benefit"].append(props.get("netBenefit", 0))
         
-        return pd.DataFrame(transfers)
+        return downcast(pd.DataFrame(transfers), _TRANSFER_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching transfer data: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching transfer data: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_players(_client):
-    """Fetch player data with detailed statistics"""
+    """Fetch player data with detailed statistics (team names are mapped by the caller)"""
     try:
-        player_view = ViewId(space=SPACE, external_id=PLAYER_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[player_view],
-            limit=1000
-        )
+        nodes = _iter_nodes(_client, _PLAYER_VIEW_ID)
         
-        # Also get teams dict for team names
-        teams_dict = fetch_teams(_client)
-        
-        players = {}
+        players = defaultdict(list)
         for node in nodes:
-            if hasattr(node, 'properties'):
-                props_dict = node.properties.dump() if hasattr(node.properties, 'dump') else node.properties
-                props = props_dict.get(SPACE, {}).get(f"{PLAYER_VIEW}/{VERSION}", {})
-                if props:
-                    team_id = props.get("plTeam", {}).get("externalId", "")
-                    team_name = teams_dict.get(team_id, "Unknown") if team_id else "Unknown"
-                    
-                    players[node.external_id] = {
-                        "name": props.get("webName", "Unknown"),
-                        "web_name": props.get("webName", "Unknown"),
-                        "full_name": props.get("fullName", ""),
-                        "team_id": team_id,
-                        "team_name": team_name,
-                        "position": props.get("position", ""),
-                        "current_price": props.get("currentPrice", 0),
-                        "total_points": props.get("totalPoints", 0),
-                        "form": props.get("form", 0),
-                        "selected_by_percent": props.get("selectedByPercent", 0),
-                        "points_per_game": props.get("pointsPerGame", 0)
-                    }
+            props = _extract_props(node, _PLAYER_VIEW_ID)
+            if props:
+                players["external_id"].append(node.external_id)
+                players["name"].append(props.get("webName", "Unknown"))
+                players["web_name"].append(props.get("webName", "Unknown"))
+                players["full_name"].append(props.get("fullName", ""))
+                players["team_id"].append(props.get("plTeam", {}).get("externalId", ""))
+                players["position"].append(props.get("position", ""))
+                players["current_price"].append(props.get("currentPrice", 0))
+                players["total_points"].append(props.get("totalPoints", 0))
+                players["form"].append(props.get("form", 0))
+                players["selected_by_percent"].append(props.get("selectedByPercent", 0))
+                players["points_per_game"].append(props.get("pointsPerGame", 0))
         
-        return players
+        return downcast(pd.DataFrame(players), _PLAYER_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching players: {e}")
-        return {}
+        return _FetchFailed(f"Error fetching players: {e}", pd.DataFrame())
+
+
+def _parse_picks(picks_json_str, python_repr):
+    """Parse a picks_json blob; Python-repr blobs are normalised to JSON first"""
+    text = picks_json_str
+    if python_repr:
+        text = text.replace("'", '"').replace("True", "true").replace("False", "false").replace("None", "null")
+    return orjson.loads(text)
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_player_picks_from_raw(_client):
     """Fetch raw player picks data to see which players were actually used"""
     try:
-        rows = _client.raw.rows.list(db_name="fantasy_football", table_name="fpl_manager_picks", limit=5000)
+        raw_columns = ["entry_id", "gameweek", "picks_json"]
+        rows = _client.raw.rows.retrieve_dataframe(
+            db_name="fantasy_football", table_name="fpl_manager_picks", columns=raw_columns, limit=5000
+        ).reindex(columns=raw_columns)
+        rows["picks_json"] = rows["picks_json"].fillna("[]")
         
-        picks_data = []
+        picks_data = defaultdict(list)
+        pick_columns = ("player_id", "multiplier", "is_captain", "is_vice_captain", "position")
         parse_errors = 0
+        python_repr = None
         
-        for row in rows:
-            cols = row.columns
-            picks_json_str = cols.get("picks_json", "[]")
-            
+        for entry_id, gameweek, picks_json_str in rows.itertuples(index=False, name=None):
             try:
-                import json
-                import ast
+                # Detect the storage format once, from the first non-empty blob
+                if python_repr is None and len(picks_json_str) > 2:
+                    python_repr = picks_json_str.lstrip("[{ ").startswith("'")
+                picks_list = _parse_picks(picks_json_str, python_repr)
                 
-                # Try to parse as proper JSON first
-                try:
-                    picks_list = json.loads(picks_json_str)
-                except:
-                    # Fall back to ast.literal_eval for Python string format
-                    picks_list = ast.literal_eval(picks_json_str)
+                picked = [
+                    (pick.get("element"), pick.get("multiplier", 1), pick.get("is_captain", False),
+                     pick.get("is_vice_captain", False), pick.get("position"))
+                    for pick in picks_list
+                ]
+                if not picked:
+                    continue
                 
-                for pick in picks_list:
-                    picks_data.append({
-                        "manager_entry_id": cols.get("entry_id"),
-                        "gameweek": cols.get("gameweek"),
-                        "player_id": pick.get("element"),
-                        "multiplier": pick.get("multiplier", 1),
-                        "is_captain": pick.get("is_captain", False),
-                        "is_vice_captain": pick.get("is_vice_captain", False),
-                        "position": pick.get("position")
-                    })
+                picks_data["manager_entry_id"].extend([entry_id] * len(picked))
+                picks_data["gameweek"].extend([gameweek] * len(picked))
+                for column, values in zip(pick_columns, zip(*picked)):
+                    picks_data[column].extend(values)
             except Exception as e:
                 parse_errors += 1
                 continue
@@ -386,128 +508,161 @@ def fetch_player_picks_from_raw(_client):
         if parse_errors > 0:
             st.warning(f"⚠️ Failed to parse {parse_errors} pick records")
         
-        return pd.DataFrame(picks_data) if picks_data else pd.DataFrame()
+        return downcast(pd.DataFrame(picks_data), _PICKS_DTYPES) if picks_data else pd.DataFrame()
     except Exception as e:
-        st.error(f"Error fetching player picks: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching player picks: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_player_gameweek_points(_client):
     """Fetch player points by gameweek from raw data"""
     try:
-        rows = _client.raw.rows.list(db_name="fantasy_football", table_name="fpl_player_gameweek", limit=10000)
-        
-        player_points = []
-        for row in rows:
-            cols = row.columns
-            player_points.append({
-                "player_id": cols.get("player_id"),
-                "gameweek": cols.get("gameweek"),
-                "total_points": cols.get("total_points", 0),
-                "minutes": cols.get("minutes", 0),
-                "goals_scored": cols.get("goals_scored", 0),
-                "assists": cols.get("assists", 0)
-            })
+        raw_columns = ["player_id", "gameweek", "total_points", "minutes", "goals_scored", "assists"]
+        player_points = _client.raw.rows.retrieve_dataframe(
+            db_name="fantasy_football", table_name="fpl_player_gameweek", columns=raw_columns, limit=10000
+        )
         
-        return pd.DataFrame(player_points)
+        # Rows missing a stat get 0 from downcast, as the per-row defaults did
+        return downcast(player_points.reindex(columns=raw_columns).reset_index(drop=True), _PLAYER_POINTS_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching player gameweek points: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching player gameweek points: {e}", pd.DataFrame())
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache(as_frame=False)
 def fetch_current_gameweek(_client):
     """Fetch the current or latest finished gameweek"""
     try:
-        gameweek_view = ViewId(space=SPACE, external_id=GAMEWEEK_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[gameweek_view],
-            limit=100
-        )
+        nodes = _iter_nodes(_client, _GAMEWEEK_VIEW_ID)
         
-        gameweeks = []
+        # Prefer the current gameweek, then the latest finished, then the latest of any
+        latest_finished = None
+        latest = None
         for node in nodes:
-            if hasattr(node, 'properties'):
-                props_dict = node.properties.dump() if hasattr(node.properties, 'dump') else node.properties
-                props = props_dict.get(SPACE, {}).get(f"{GAMEWEEK_VIEW}/{VERSION}", {})
-                if props:
-                    gameweeks.append({
-                        "external_id": node.external_id,
-                        "gameweek_number": props.get("gameweekNumber", 0),
-                        "name": props.get("name", ""),
-                        "is_current": props.get("isCurrent", False),
-                        "is_finished": props.get("isFinished", False),
-                        "average_score": props.get("averageScore", 0),
-                        "highest_score": props.get("highestScore", 0)
-                    })
-        
-        if gameweeks:
-            # First try to find current gameweek
-            current = [gw for gw in gameweeks if gw["is_current"]]
-            if current:
-                return current[0]
-            # Otherwise get the latest finished gameweek
-            finished = [gw for gw in gameweeks if gw["is_finished"]]
-            if finished:
-                return max(finished, key=lambda x: x["gameweek_number"])
-            # Otherwise just get the latest gameweek
-            return max(gameweeks, key=lambda x: x["gameweek_number"])
+            props = _extract_props(node, _GAMEWEEK_VIEW_ID)
+            if props:
+                gameweek = {
+                    "external_id": node.external_id,
+                    "gameweek_number": props.get("gameweekNumber", 0),
+                    "name": props.get("name", ""),
+                    "is_current": props.get("isCurrent", False),
+                    "is_finished": props.get("isFinished", False),
+                    "average_score": props.get("averageScore", 0),
+                    "highest_score": props.get("highestScore", 0)
+                }
+                if gameweek["is_current"]:
+                    return gameweek
+                if gameweek["is_finished"] and (latest_finished is None or gameweek["gameweek_number"] > latest_finished["gameweek_number"]):
+                    latest_finished = gameweek
+                if latest is None or gameweek["gameweek_number"] > latest["gameweek_number"]:
+                    latest = gameweek
         
-        return None
+        return latest_finished or latest
     except Exception as e:
-        st.error(f"Error fetching current gameweek: {e}")
-        return None
+        return _FetchFailed(f"Error fetching current gameweek: {e}", None)
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_manager_teams(_client, gameweek_number=None):
     """Fetch manager teams for a specific gameweek (captain, chip info)"""
     try:
-        manager_team_view = ViewId(space=SPACE, external_id=MANAGER_TEAM_VIEW, version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[manager_team_view],
-            limit=1000
-        )
+        nodes = _iter_nodes(_client, _MANAGER_TEAM_VIEW_ID)
         
-        manager_teams = []
+        manager_teams = defaultdict(list)
         for node in nodes:
-            if hasattr(node, 'properties'):
-                props_dict = node.properties.dump() if hasattr(node.properties, 'dump') else node.properties
-                props = props_dict.get(SPACE, {}).get(f"{MANAGER_TEAM_VIEW}/{VERSION}", {})
-                if props:
-                    # Extract gameweek number from external_id or gameweek relation
-                    gameweek_id = props.get("gameweek", {}).get("externalId", "")
-                    gw_num = gameweek_id.split("_")[-1] if gameweek_id else "0"
-                    
-                    # If filtering by gameweek, skip if doesn't match
-                    if gameweek_number is not None:
-                        if not gw_num.isdigit() or int(gw_num) != gameweek_number:
-                            continue
-                    
-                    manager_id = props.get("manager", {}).get("externalId", "")
-                    captain_id = props.get("captain", {}).get("externalId", "")
-                    vice_captain_id = props.get("viceCaptain", {}).get("externalId", "")
-                    
-                    manager_teams.append({
-                        "external_id": node.external_id,
-                        "manager_id": manager_id,
-                        "gameweek": int(gw_num) if gw_num.isdigit() else 0,
-                        "captain_id": captain_id,
-                        "vice_captain_id": vice_captain_id,
-                        "active_chip": props.get("activeChip", ""),
-                        "formation": props.get("formation"),
-                        "total_points": props.get("totalPoints", 0),
-                        "team_value": props.get("teamValue", 0),
-                        "bank": props.get("bank", 0)
-                    })
+            props = _extract_props(node, _MANAGER_TEAM_VIEW_ID)
+            if props:
+                # Extract gameweek number from external_id or gameweek relation
+                gameweek = _gameweek_number(props.get("gameweek", {}).get("externalId", ""))
+                
+                # If filtering by gameweek, skip if doesn't match
+                if gameweek_number is not None and gameweek != gameweek_number:
+                    continue
+                
+                manager_id = props.get("manager", {}).get("externalId", "")
+                captain_id = props.get("captain", {}).get("externalId", "")
+                vice_captain_id = props.get("viceCaptain", {}).get("externalId", "")
+                
+                manager_teams["external_id"].append(node.external_id)
+                manager_teams["manager_id"].append(manager_id)
+                manager_teams["gameweek"].append(gameweek)
+                manager_teams["captain_id"].append(captain_id)
+                manager_teams["vice_captain_id"].append(vice_captain_id)
+                manager_teams["active_chip"].append(props.get("activeChip", ""))
+                manager_teams["formation"].append(props.get("formation"))
+                manager_teams["total_points"].append(props.get("totalPoints", 0))
+                manager_teams["team_value"].append(props.get("teamValue", 0))
+                manager_teams["bank"].append(props.get("bank", 0))
         
-        return pd.DataFrame(manager_teams)
+        return downcast(pd.DataFrame(manager_teams), _MANAGER_TEAM_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching manager teams: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching manager teams: {e}", pd.DataFrame())
+
+
+_INT_DTYPES = ("int8", "int16", "int32", "int64")
+
+
+def _fitting_int(values, dtype):
+    """The given integer dtype, or the next wider one if any value would overflow it"""
+    if values.empty:
+        return dtype
+    low, high = values.min(), values.max()
+    for candidate in _INT_DTYPES[_INT_DTYPES.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+    return "int64"
+
+
+def downcast(df, dtypes):
+    """Cast columns to compact dtypes, skipping absent columns (missing integers become 0)"""
+    dtypes = {col: dtype for col, dtype in dtypes.items() if col in df.columns}
+    int_defaults = {col: 0 for col, dtype in dtypes.items() if dtype.startswith("int")}
+    df = df.fillna(int_defaults)
+    # astype wraps out-of-range integers silently, so widen columns that would overflow
+    for col in int_defaults:
+        dtypes[col] = _fitting_int(pd.to_numeric(df[col]), dtypes[col])
+    return df.astype(dtypes)
+
+
+def as_dict(df, key="external_id"):
+    """Row dicts keyed by one column, for code that looks rows up one at a time"""
+    if df.empty:
+        return {}
+    return df.set_index(key).to_dict("index")
+
+
+@dataclass(frozen=True)
+class Lookups:
+    """Lookup tables derived from the teams dict and players frame (shared, so read-only)"""
+    players_df: pd.DataFrame  # player_id (int), name, team_id
+    color_map: dict  # team name -> primary color
+    players_by_id: dict  # player external_id -> row dict, including team_name
+
+
+def _dict_fingerprint(d):
+    """Cache key for the teams dict, so a renamed team rebuilds the lookups"""
+    return hash(tuple(sorted(d.items())))
+
+
+@st.cache_resource(ttl=CACHE_TTL, hash_funcs={dict: _dict_fingerprint})
+def get_lookups(teams_dict, players):
+    """Build shared lookup tables once instead of on every rerun"""
+    players_df = pd.DataFrame(columns=["player_id", "name", "team_id"])
+    players_by_id = {}
+    if not players.empty:
+        player_ids = players["external_id"].str.rpartition("_")[2]
+        numeric = player_ids.str.isdigit()
+        players_df = pd.DataFrame({
+            "player_id": player_ids[numeric].astype(int),
+            "name": players.loc[numeric, "name"],
+            "team_id": players.loc[numeric, "team_id"]
+        }).reset_index(drop=True)
+        players_by_id = as_dict(players.assign(team_name=players["team_id"].map(teams_dict).fillna("Unknown")))
+    color_map = {team_name: get_team_color(team_name) for team_name in teams_dict.values()}
+    return Lookups(players_df=players_df, color_map=color_map, players_by_id=players_by_id)
 
 
 def get_team_color(team_name):
@@ -516,90 +671,91 @@ def get_team_color(team_name):
     return colors["primary"]
 
 
+_BADGE_HTML = '<span class="team-badge" style="background-color: {color}; color: {text_color};">{name}</span>'.format
+_TEAM_TEXT_COLOR = {team_name: "#000000" if team_name == "Fulham" else "#FFFFFF" for team_name in PREMIER_LEAGUE_COLORS}
+
+
 def create_team_badge(team_name, team_color):
     """Create a colored badge HTML for a team"""
-    text_color = "#FFFFFF" if team_name != "Fulham" else "#000000"
-    return f'<span class="team-badge" style="background-color: {team_color}; color: {text_color};">{team_name}</span>'
+    return _BADGE_HTML(color=team_color, text_color=_TEAM_TEXT_COLOR.get(team_name, "#FFFFFF"), name=team_name)
 
 
 @st.cache_data(ttl=CACHE_TTL)
+@_disk_cache()
 def fetch_fixtures(_client):
     """Fetch all fixtures with odds and difficulty ratings"""
     try:
-        from cognite.client.data_classes.data_modeling.ids import ViewId
-        
-        fixture_view = ViewId(space=SPACE, external_id="Fixture", version=VERSION)
-        nodes = _client.data_modeling.instances.list(
-            instance_type="node",
-            sources=[fixture_view],
-            limit=500
-        )
+        nodes = _iter_nodes(_client, _FIXTURE_VIEW_ID)
         
-        fixtures = []
+        fixtures = defaultdict(list)
         for node in nodes:
-            if hasattr(node, 'properties'):
-                props_dict = node.properties.dump() if hasattr(node.properties, 'dump') else node.properties
-                props = props_dict.get(SPACE, {}).get(f"Fixture/{VERSION}", {})
+            props = _extract_props(node, _FIXTURE_VIEW_ID)
+            if props:
+                # Extract team IDs
+                home_team = props.get('homeTeam', {})
+                away_team = props.get('awayTeam', {})
+                gameweek = props.get('gameweek', {})
                 
-                if props:
-                    # Extract team IDs
-                    home_team = props.get('homeTeam', {})
-                    away_team = props.get('awayTeam', {})
-                    gameweek = props.get('gameweek', {})
-                    
-                    home_team_id = home_team.get('externalId', '') if isinstance(home_team, dict) else ''
-                    away_team_id = away_team.get('externalId', '') if isinstance(away_team, dict) else ''
-                    gameweek_id = gameweek.get('externalId', '') if isinstance(gameweek, dict) else ''
-                    
-                    gw_num = gameweek_id.split('_')[-1] if gameweek_id else '0'
-                    
-                    fixtures.append({
-                        "fixture_id": props.get("fixtureId"),
-                        "gameweek": int(gw_num) if gw_num.isdigit() else 0,
-                        "home_team_id": home_team_id,
-                        "away_team_id": away_team_id,
-                        "kickoff_time": props.get("kickoffTime"),
-                        "home_team_difficulty": props.get("homeTeamDifficulty"),
-                        "away_team_difficulty": props.get("awayTeamDifficulty"),
-                        "home_team_score": props.get("homeTeamScore"),
-                        "away_team_score": props.get("awayTeamScore"),
-                        "is_finished": props.get("isFinished", False),
-                        "started": props.get("started", False),
-                        "home_win_odds": props.get("homeWinOdds"),
-                        "draw_odds": props.get("drawOdds"),
-                        "away_win_odds": props.get("awayWinOdds"),
-                        "home_win_probability": props.get("homeWinProbability"),
-                        "draw_probability": props.get("drawProbability"),
-                        "away_win_probability": props.get("awayWinProbability"),
-                    })
+                home_team_id = home_team.get('externalId', '') if isinstance(home_team, dict) else ''
+                away_team_id = away_team.get('externalId', '') if isinstance(away_team, dict) else ''
+                gameweek_id = gameweek.get('externalId', '') if isinstance(gameweek, dict) else ''
+                
+                fixtures["fixture_id"].append(props.get("fixtureId"))
+                fixtures["gameweek"].append(_gameweek_number(gameweek_id))
+                fixtures["home_team_id"].append(home_team_id)
+                fixtures["away_team_id"].append(away_team_id)
+                fixtures["kickoff_time"].append(props.get("kickoffTime"))
+                fixtures["home_team_difficulty"].append(props.get("homeTeamDifficulty"))
+                fixtures["away_team_difficulty"].append(props.get("awayTeamDifficulty"))
+                fixtures["home_team_score"].append(props.get("homeTeamScore"))
+                fixtures["away_team_score"].append(props.get("awayTeamScore"))
+                fixtures["is_finished"].append(props.get("isFinished", False))
+                fixtures["started"].append(props.get("started", False))
+                fixtures["home_win_odds"].append(props.get("homeWinOdds"))
+                fixtures["draw_odds"].append(props.get("drawOdds"))
+                fixtures["away_win_odds"].append(props.get("awayWinOdds"))
+                fixtures["home_win_probability"].append(props.get("homeWinProbability"))
+                fixtures["draw_probability"].append(props.get("drawProbability"))
+                fixtures["away_win_probability"].append(props.get("awayWinProbability"))
         
-        return pd.DataFrame(fixtures)
+        return downcast(pd.DataFrame(fixtures), _FIXTURE_DTYPES)
     except Exception as e:
-        st.error(f"Error fetching fixtures: {e}")
-        return pd.DataFrame()
+        return _FetchFailed(f"Error fetching fixtures: {e}", pd.DataFrame())
 
 
-def apply_plotly_theme(fig):
-    """Apply custom theme to plotly figure without overwriting existing settings"""
-    fig.update_layout(
-        paper_bgcolor=PLOTLY_THEME["layout"]["paper_bgcolor"],
-        plot_bgcolor=PLOTLY_THEME["layout"]["plot_bgcolor"],
-        font=PLOTLY_THEME["layout"]["font"],
-        title_font=PLOTLY_THEME["layout"]["title"]["font"]
-    )
-    
-    # Update axis properties without overwriting titles
-    fig.update_xaxes(
-        gridcolor=PLOTLY_THEME["layout"]["xaxis"]["gridcolor"],
-        linecolor=PLOTLY_THEME["layout"]["xaxis"]["linecolor"],
-        tickfont=PLOTLY_THEME["layout"]["xaxis"]["tickfont"]
-    )
+def prefetch_all(client):
+    """Warm every client-only fetcher concurrently, once per session.
     
-    fig.update_yaxes(
-        gridcolor=PLOTLY_THEME["layout"]["yaxis"]["gridcolor"],
-        linecolor=PLOTLY_THEME["layout"]["yaxis"]["linecolor"],
-        tickfont=PLOTLY_THEME["layout"]["yaxis"]["tickfont"]
+    Each fetcher is cached with st.cache_data, so later calls from the tabs
+    are cache hits and cold-start latency is the slowest fetch, not the sum.
+    Reruns skip the warm-up rather than paying for nine cache lookups.
+    """
+    if st.session_state.get("prefetched"):
+        return
+    fetchers = (
+        fetch_managers, fetch_players, fetch_teams, fetch_transfer_data,
+        fetch_team_betting_data, fetch_fixtures, fetch_current_gameweek,
+        fetch_player_picks_from_raw, fetch_player_gameweek_points
     )
-    
+    with fetch_executor() as executor:
+        for future in as_completed([executor.submit(fetcher, client) for fetcher in fetchers]):
+            future.result()
+    st.session_state["prefetched"] = True
+
+
+_THEME_LAYOUT = {
+    "paper_bgcolor": PLOTLY_THEME["layout"]["paper_bgcolor"],
+    "plot_bgcolor": PLOTLY_THEME["layout"]["plot_bgcolor"],
+    "font": PLOTLY_THEME["layout"]["font"],
+    "title_font": PLOTLY_THEME["layout"]["title"]["font"],
+    "xaxis": {key: PLOTLY_THEME["layout"]["xaxis"][key] for key in ("gridcolor", "linecolor", "tickfont")},
+    "yaxis": {key: PLOTLY_THEME["layout"]["yaxis"][key] for key in ("gridcolor", "linecolor", "tickfont")}
+}
+
+
+def apply_plotly_theme(fig):
+    """Apply custom theme to plotly figure without overwriting existing settings"""
+    # One merge into the layout; nested axis dicts are updated, so titles are kept
+    fig.update_layout(_THEME_LAYOUT)
     return fig
 